@@ -0,0 +1,67 @@
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from config import settings
+from downloader import get_download_queue
+from sources import shutdown_sources, startup_sources
+from sources.catalog import CatalogCrawler, get_catalog
+from sources.ratelimit import RateLimitExceeded
+from sources.watcher import get_update_watcher
+from .chapters import pages_router, router as chapters_router
+from .deps import identify_client, profile_flag
+from .downloads import router as downloads_router
+from .images import router as images_router
+from .metrics import router as metrics_router
+from .search import router as search_router
+from .streaming import router as streaming_router
+from .updates import router as updates_router
+
+router = APIRouter(
+    prefix=settings.API_PREFIX,
+    dependencies=[Depends(identify_client), Depends(profile_flag)],
+)
+router.include_router(chapters_router)
+router.include_router(pages_router)
+router.include_router(streaming_router)
+router.include_router(images_router)
+router.include_router(downloads_router)
+router.include_router(updates_router)
+router.include_router(search_router)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_sources()
+    catalog = get_catalog()
+    crawler = None
+    if catalog is not None and settings.CATALOG_CRAWL_INTERVAL > 0:
+        crawler = CatalogCrawler(catalog)
+        crawler.start()
+    # Resume bulk download jobs interrupted by the last shutdown
+    download_queue = get_download_queue()
+    await download_queue.start()
+    watcher = get_update_watcher() if settings.WATCHER_ENABLED else None
+    if watcher is not None:
+        watcher.start()
+    yield
+    if watcher is not None:
+        await watcher.stop()
+    await download_queue.stop()
+    if crawler is not None:
+        await crawler.stop()
+    await shutdown_sources()
+
+async def rate_limit_exceeded(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"success": False, "message": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+def create_app() -> FastAPI:
+    """Build the API application"""
+    app = FastAPI(title=settings.APP_NAME, version=settings.VERSION, lifespan=lifespan)
+    app.include_router(router)
+    # Scraped by the local Prometheus agent; not under the client rate limit
+    app.include_router(metrics_router)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded)
+    return app
@@ -0,0 +1,95 @@
+import math
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from images import proxy_url
+from models.schemas import APIResponse, ChapterPages, PaginatedResponse
+from sources.tracker import get_chapter_tracker
+from .deps import details_or_502, source_or_404
+
+router = APIRouter(prefix="/sources/{source_id}/manga/{manga_id}/chapters", tags=["chapters"])
+
+# Chapter IDs can contain slashes, so they are passed as a query parameter
+pages_router = APIRouter(prefix="/sources/{source_id}/pages", tags=["chapters"])
+
+@router.get("", response_model=PaginatedResponse)
+async def list_chapters(
+    source_id: str,
+    manga_id: str,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(50, ge=1, le=500),
+    start: Optional[float] = Query(None, description="Lowest chapter number"),
+    end: Optional[float] = Query(None, description="Highest chapter number"),
+    order: Literal["asc", "desc"] = "desc",
+):
+    """Page through a series' chapters, optionally within a number range"""
+    details = await details_or_502(source_or_404(source_id), manga_id)
+    chapters = details.chapters
+    positions = chapters.number_index().range(start, end)
+    if order == "desc":
+        positions = positions[::-1]
+
+    offset = (page - 1) * per_page
+    return PaginatedResponse(
+        page=page,
+        per_page=per_page,
+        total=len(positions),
+        total_pages=math.ceil(len(positions) / per_page),
+        data=chapters.take(positions[offset:offset + per_page]).to_list(),
+    )
+
+@router.get("/new", response_model=APIResponse)
+async def new_chapters(
+    source_id: str,
+    manga_id: str,
+    number: Optional[float] = Query(None, description="Only chapters numbered above this"),
+    since: Optional[float] = Query(None, description="Only chapters first seen after this Unix time"),
+):
+    """Chapters added since a chapter number and/or a time, in ascending
+    order, after a conditional refresh of the series' chapter index"""
+    source = source_or_404(source_id)
+    tracker = get_chapter_tracker()
+    try:
+        await tracker.refresh(source, manga_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    chapters = tracker.chapters_since(source_id, manga_id, number, since)
+    return APIResponse(data={"chapters": chapters.to_list()})
+
+@router.get("/{number}", response_model=APIResponse)
+async def get_chapter(source_id: str, manga_id: str, number: float):
+    """One chapter by number, with its neighbours for navigation"""
+    details = await details_or_502(source_or_404(source_id), manga_id)
+    chapters = details.chapters
+    index = chapters.number_index()
+    positions = index.find(number)
+    if not positions:
+        raise HTTPException(status_code=404, detail=f"Chapter {number:g} not found")
+
+    def row(position: Optional[int]) -> Optional[dict]:
+        return None if position is None else chapters.row(position)._asdict()
+
+    return APIResponse(data={
+        "chapter": row(positions[0]),
+        "alternatives": [row(p) for p in positions[1:]],  # Other scanlations
+        "previous": row(index.previous(number)),
+        "next": row(index.next(number)),
+    })
+
+@pages_router.get("", response_model=ChapterPages)
+async def get_chapter_pages(
+    source_id: str,
+    chapter_id: str,
+    w: Optional[int] = Query(None, ge=16, le=4096, description="Proxy pages at this width"),
+):
+    """A chapter's page image URLs, optionally as signed image proxy URLs"""
+    source = source_or_404(source_id)
+    try:
+        chapter = await source.get_chapter_pages(chapter_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    if w:
+        # Cached instances are shared; rewrite a copy
+        chapter = chapter.model_copy(
+            update={"pages": [proxy_url(source_id, page, w) for page in chapter.pages]}
+        )
+    return chapter
@@ -0,0 +1,42 @@
+import hmac
+from fastapi import HTTPException, Request
+from config import settings
+from models.schemas import MangaDetails
+from sources import get_source
+from sources.base import BaseMangaSource
+from sources.profiling import profile_request
+from sources.ratelimit import get_rate_limiter
+
+async def identify_client(request: Request) -> str:
+    """Charge the request to its API client's rate limit (429 over budget).
+
+    The ID is the peer address: a client-supplied header could be rotated
+    to get a fresh budget on every request.
+    """
+    client_id = request.client.host if request.client else "anonymous"
+    get_rate_limiter().check_client(client_id)
+    return client_id
+
+async def profile_flag(request: Request) -> None:
+    """Honour the profiling header for callers holding PROFILE_TOKEN"""
+    if not settings.PROFILING_ENABLED or not settings.PROFILE_TOKEN:
+        return
+    flag = request.headers.get(settings.PROFILE_HEADER)
+    token = request.headers.get(settings.PROFILE_TOKEN_HEADER, "")
+    if flag and hmac.compare_digest(token.encode(), settings.PROFILE_TOKEN.encode()):
+        profile_request.set(flag)
+
+def source_or_404(source_id: str) -> BaseMangaSource:
+    source = get_source(source_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail=f"Unknown source: {source_id}")
+    return source
+
+async def details_or_502(source: BaseMangaSource, manga_id: str) -> MangaDetails:
+    """Fetch (usually from cache) the details of a series"""
+    try:
+        return await source.get_manga_details(manga_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
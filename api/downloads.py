@@ -0,0 +1,50 @@
+"""Bulk download jobs, with progress as server-sent events."""
+from contextlib import aclosing
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from downloader import get_download_queue
+from models.schemas import BulkDownloadRequest, DownloadJobProgress
+
+router = APIRouter(prefix="/downloads/jobs", tags=["downloads"])
+
+@router.post("", response_model=DownloadJobProgress, status_code=202)
+async def create_job(request: BulkDownloadRequest):
+    """Queue the download of a series' chapters (optionally a number range)"""
+    try:
+        return await get_download_queue().submit(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+
+@router.get("/{job_id}", response_model=DownloadJobProgress)
+async def get_job(job_id: str):
+    progress = await get_download_queue().progress(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return progress
+
+@router.delete("/{job_id}", response_model=DownloadJobProgress)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    queue = get_download_queue()
+    if not await queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running")
+    return await queue.progress(job_id)
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """Job progress as server-sent events; the stream ends with the job"""
+    queue = get_download_queue()
+    if await queue.progress(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    async def events() -> AsyncIterator[bytes]:
+        async with aclosing(queue.subscribe(job_id)) as updates:
+            async for progress in updates:
+                yield b"event: progress\ndata: " + progress.model_dump_json().encode() + b"\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
@@ -0,0 +1,29 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from images import get_image_proxy, verify
+from .deps import source_or_404
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+@router.get("/{source_id}")
+async def proxy_image(
+    request: Request,
+    source_id: str,
+    url: str,
+    sig: str,
+    w: Optional[int] = Query(None, ge=16, le=4096, description="Target width"),
+    q: Optional[int] = Query(None, ge=10, le=100, description="Encoder quality"),
+):
+    """Serve a source image resized and transcoded (see images.proxy_url)"""
+    source = source_or_404(source_id)
+    if not verify(source_id, url, sig):
+        raise HTTPException(status_code=403, detail="Invalid image signature")
+    try:
+        variant = await get_image_proxy().get(source, url, w, q)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Image error: {e}")
+
+    headers = {"ETag": variant.etag, "Cache-Control": "public, max-age=604800, immutable"}
+    if request.headers.get("If-None-Match") == variant.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(variant.data, media_type=variant.media_type, headers=headers)
@@ -0,0 +1,32 @@
+"""Search across every enabled source."""
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from models.schemas import FederatedSearchResponse
+from sources.federated import federated_search, federated_search_stream
+from .streaming import NDJSON
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+QUERY = Query(..., min_length=1, description="Search terms")
+TIMEOUT = Query(None, gt=0, le=60, description="Seconds to wait for slow sources")
+
+@router.get("", response_model=FederatedSearchResponse)
+async def search_all(q: str = QUERY, page: int = Query(1, ge=1),
+                     timeout: Optional[float] = TIMEOUT):
+    """Results from every source, merged by title"""
+    return await federated_search(q, page, timeout=timeout)
+
+@router.get("/stream")
+async def stream_search_all(q: str = QUERY, page: int = Query(1, ge=1),
+                            timeout: Optional[float] = TIMEOUT):
+    """One NDJSON line per source, in the order the sources answer"""
+
+    async def body() -> AsyncIterator[bytes]:
+        async with aclosing(federated_search_stream(q, page, timeout=timeout)) as batches:
+            async for batch in batches:
+                yield to_json(batch) + b"\n"
+
+    return StreamingResponse(body(), media_type=NDJSON)
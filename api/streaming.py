@@ -0,0 +1,97 @@
+"""Newline-delimited JSON endpoints.
+
+The first line of every stream is a header object describing the
+payload; each following line is one item (a chapter or a listing entry).
+Items are encoded in small batches as they become available, so clients
+can render progressively and no full response body is ever built.
+"""
+from typing import Any, AsyncIterator, Iterable, List, Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from images import proxy_url
+from sources.base import BaseMangaSource
+from .deps import details_or_502, source_or_404
+
+NDJSON = "application/x-ndjson"
+
+# Items encoded per yielded chunk
+BATCH_SIZE = 200
+
+router = APIRouter(prefix="/sources/{source_id}", tags=["streaming"])
+
+# "page" emits listing pages in page order, "completed" as they arrive
+ORDER = Query("page", pattern="^(page|completed)$", description="Listing page order")
+
+# Optional "thumb" parameter: serve covers through the image proxy at this width
+THUMB = Query(None, ge=16, le=1080, description="Proxy covers at this width")
+
+def _lines(items: Iterable[Any]) -> bytes:
+    return b"".join(to_json(item) + b"\n" for item in items)
+
+def _with_thumb(source_id: str, record: dict, thumb: Optional[int]) -> dict:
+    if thumb and record.get("cover"):
+        record["cover"] = proxy_url(source_id, record["cover"], thumb)
+    return record
+
+@router.get("/manga/{manga_id}/stream")
+async def stream_manga_details(source_id: str, manga_id: str,
+                               thumb: Optional[int] = THUMB):
+    """Series details as NDJSON: the details (without chapters) first,
+    then one chapter per line"""
+    details = await details_or_502(source_or_404(source_id), manga_id)
+
+    async def body() -> AsyncIterator[bytes]:
+        header = details.model_dump(mode="json", exclude={"chapters"})
+        yield _lines([_with_thumb(source_id, header, thumb)])
+        chapters = details.chapters
+        for start in range(0, len(chapters), BATCH_SIZE):
+            yield _lines(chapters.to_list(start, start + BATCH_SIZE))
+
+    return StreamingResponse(body(), media_type=NDJSON)
+
+async def _listing_lines(source: BaseMangaSource, method: str, pages: List[int],
+                         ordered: bool, thumb: Optional[int]) -> AsyncIterator[bytes]:
+    yield _lines([{"source": source.source_id, "listing": method, "pages": pages}])
+    # Pages are fetched concurrently (see BaseMangaSource.iter_listing);
+    # entries repeated on a later page are skipped
+    async for listing in source.iter_listing(method, pages, ordered=ordered):
+        if listing.error:
+            yield _lines([{"page": listing.page, "error": listing.error}])
+            continue
+        items = listing.items
+        for start in range(0, len(items), BATCH_SIZE):
+            yield _lines(
+                _with_thumb(
+                    source.source_id, {"page": listing.page, **item.model_dump(mode="json")}, thumb
+                )
+                for item in items[start:start + BATCH_SIZE]
+            )
+
+@router.get("/popular/stream")
+async def stream_popular(source_id: str,
+                         start: int = Query(1, ge=1),
+                         pages: int = Query(1, ge=1, le=20),
+                         order: str = ORDER,
+                         thumb: Optional[int] = THUMB):
+    """Popular manga over several listing pages as NDJSON"""
+    source = source_or_404(source_id)
+    page_numbers = list(range(start, start + pages))
+    return StreamingResponse(
+        _listing_lines(source, "get_popular", page_numbers, order == "page", thumb),
+        media_type=NDJSON,
+    )
+
+@router.get("/latest/stream")
+async def stream_latest(source_id: str,
+                        start: int = Query(1, ge=1),
+                        pages: int = Query(1, ge=1, le=20),
+                        order: str = ORDER,
+                        thumb: Optional[int] = THUMB):
+    """Latest updates over several listing pages as NDJSON"""
+    source = source_or_404(source_id)
+    page_numbers = list(range(start, start + pages))
+    return StreamingResponse(
+        _listing_lines(source, "get_latest", page_numbers, order == "page", thumb),
+        media_type=NDJSON,
+    )
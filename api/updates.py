@@ -0,0 +1,34 @@
+"""New-chapter events from the update watcher, as server-sent events."""
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from config import settings
+from sources.watcher import UpdateWatcher, get_update_watcher
+
+router = APIRouter(prefix="/updates", tags=["updates"])
+
+def _watcher_or_404() -> UpdateWatcher:
+    if not settings.WATCHER_ENABLED:
+        raise HTTPException(status_code=404, detail="The update watcher is disabled")
+    return get_update_watcher()
+
+@router.get("")
+async def watcher_status():
+    """Polling interval, publish rate and errors per source"""
+    return _watcher_or_404().status()
+
+@router.get("/events")
+async def update_events(source: Optional[str] = Query(None, description="Only this source")):
+    """Series with new chapters as server-sent events, until the client disconnects"""
+    watcher = _watcher_or_404()
+
+    async def events() -> AsyncIterator[bytes]:
+        async with aclosing(watcher.subscribe()) as updates:
+            async for event in updates:
+                if source is None or event.source == source:
+                    yield b"event: update\ndata: " + event.model_dump_json().encode() + b"\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
@@ -0,0 +1,118 @@
+"""Build, memory and serialization cost of MangaDetails chapter lists.
+
+Compares the previous representation (a validated ``Chapter`` model per
+chapter in a ``List[Chapter]`` field) with the column-oriented
+``ChapterList``, starting from the plain records an extractor returns.
+
+"build" turns the records into a MangaDetails; "memory" is what the
+result keeps alive (tracemalloc); "dump_json" is ``model_dump_json()``;
+"fast cold" / "fast warm" are ``models.chapters.dump_json`` on a fresh
+and on an already-serialized object (a response cache hit); "pickle" is
+the disk cache payload size.
+
+    python benchmarks/bench_chapters.py --chapters 100 1500 5000
+"""
+import argparse
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import BaseModel  # noqa: E402
+from models.chapters import ChapterList, ChapterRow, dump_json  # noqa: E402
+from models.schemas import Chapter, MangaDetails  # noqa: E402
+
+
+class LegacyDetails(MangaDetails):
+    """MangaDetails as it was before ChapterList"""
+    chapters: List[Chapter] = []
+
+
+def make_records(count: int) -> List[dict]:
+    return [
+        {
+            "url": f"https://chapmanganato.to/manga-dr980474/chapter-{n}",
+            "title": f"Vol.{n // 10 + 1} Chapter {n}: The “Return” of the Hunter",
+            "release_date": f"Dec {n % 28 + 1},2021 05:00",
+        }
+        for n in range(count, 0, -1)
+    ]
+
+
+def build_legacy(records: List[dict]) -> BaseModel:
+    chapters = [
+        Chapter(id=r["url"], number=float(i), title=r["title"], url=r["url"],
+                release_date=r["release_date"])
+        for i, r in enumerate(records)
+    ]
+    return LegacyDetails(id="dr980474", title="Solo Leveling", source="manganato",
+                         url="https://chapmanganato.to/manga-dr980474",
+                         chapters=chapters, total_chapters=len(chapters))
+
+
+def build_columns(records: List[dict]) -> BaseModel:
+    chapters = ChapterList(
+        ChapterRow(r["url"], float(i), r["title"], r["url"], r["release_date"])
+        for i, r in enumerate(records)
+    )
+    return MangaDetails(id="dr980474", title="Solo Leveling", source="manganato",
+                        url="https://chapmanganato.to/manga-dr980474",
+                        chapters=chapters, total_chapters=len(chapters))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def retained(build, records) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    details = build(records)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del details
+    return size
+
+
+def run(name: str, build, records: List[dict], repeat: int) -> None:
+    details = build(records)
+    build_ms = timed(lambda: build(records), repeat)
+    memory = retained(build, records)
+    dump_ms = timed(details.model_dump_json, repeat)
+    cold_ms = timed(lambda: dump_json(build(records)), repeat) - build_ms
+    dump_json(details)
+    warm_ms = timed(lambda: dump_json(details), repeat)
+    size = len(pickle.dumps(details))
+    print(
+        f"  {name:<8} {build_ms:>8.2f}ms {memory / 1024:>8.0f}KB {dump_ms:>8.2f}ms "
+        f"{max(cold_ms, 0):>8.2f}ms {warm_ms:>8.2f}ms {size / 1024:>8.0f}KB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapters", type=int, nargs="+", default=[100, 1500, 5000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for count in args.chapters:
+        records = make_records(count)
+        print(f"{count} chapters")
+        print(f"  {'':<8} {'build':>10} {'memory':>10} {'dump_json':>10} "
+              f"{'fast cold':>10} {'fast warm':>10} {'pickle':>10}")
+        run("legacy", build_legacy, records, args.repeat)
+        run("columns", build_columns, records, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cold-start cost of the source registry.
+
+Each scenario runs in a fresh interpreter so nothing is cached between
+runs; the reported time is the median wall time of the scenario body
+(interpreter startup excluded) plus the heavy modules it ended up
+importing.
+
+    python benchmarks/bench_coldstart.py --runs 7
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("cloudscraper", "bs4", "PIL", "lxml", "httpx")
+
+SCENARIOS = {
+    "import": "import sources",
+    "first-source": "import sources; sources.get_source('manganato')",
+    "all-sources": "import sources; list(sources.get_all_sources().values())",
+    "first-scrape-client": (
+        "import sources; sources.get_source('asurascans').scraper"
+    ),
+}
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run(body: str) -> dict:
+    code = CHILD.format(root=str(ROOT), body=body, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS),
+                        choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    print(f"{'scenario':<20} {'median':>9} {'min':>9}  heavy modules loaded")
+    for name in args.scenarios:
+        results = [run(SCENARIOS[name]) for _ in range(args.runs)]
+        times = [r["elapsed"] for r in results]
+        print(
+            f"{name:<20} {statistics.median(times) * 1000:>7.1f}ms "
+            f"{min(times) * 1000:>7.1f}ms  {', '.join(results[-1]['modules']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Concurrent-request throughput of the source fetch layer.
+
+Runs fully offline: the cloudscraper request is replaced by a blocking sleep that
+stands in for a slow Cloudflare-protected upstream. The "inline" mode
+reproduces the old behaviour (blocking call on the event loop), the
+"executor" mode uses ``BaseMangaSource.fetch_page``.
+
+    python benchmarks/bench_fetch.py --requests 64 --latency 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from sources.asurascans import AsuraScansSource  # noqa: E402
+
+LISTING_HTML = """
+<div class="listupd">
+  <div class="bs"><a href="https://asuracomic.net/manga/solo-leveling/">
+    <img src="https://img.example/solo.webp"/>
+    <div class="tt">Solo Leveling</div><div class="epxs">Chapter 200</div>
+  </a></div>
+</div>
+"""
+
+
+class FakeResponse:
+    status_code = 200
+    headers: dict = {}
+    text = LISTING_HTML
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class SlowSource(AsuraScansSource):
+    def __init__(self, latency: float, inline: bool):
+        super().__init__()
+        self.latency = latency
+        self.inline = inline
+
+    def _scraper_get(self, url: str, headers=None) -> FakeResponse:
+        time.sleep(self.latency)
+        return FakeResponse()
+
+    async def fetch_page(self, url: str) -> str:
+        if self.inline:
+            return self._scraper_get(url).text
+        return await super().fetch_page(url)
+
+
+async def run(mode: str, requests: int, latency: float) -> float:
+    source = SlowSource(latency, inline=(mode == "inline"))
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(source.search(f"query {i}") for i in range(requests))
+    )
+    elapsed = time.perf_counter() - start
+    assert all(len(r) == 1 for r in results)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    # Measure the fetch layer, not the response cache or upstream rate limit
+    settings.CACHE_ENABLED = False
+    settings.HOST_RATE_LIMIT = 1e6
+    settings.HOST_RATE_BURST = args.requests
+
+    print(f"{args.requests} concurrent searches, {args.latency:.3f}s upstream latency")
+    for mode in ("inline", "executor"):
+        elapsed = asyncio.run(run(mode, args.requests, args.latency))
+        print(f"  {mode:<9} {elapsed:7.3f}s  {args.requests / elapsed:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Offline parsing benchmark for source scrape methods.
+
+Every case replays a recorded HTML fixture from benchmarks/fixtures
+through the real scrape method (fetching is stubbed out and the response
+cache bypassed), so the numbers cover extraction plus model building.
+The "*_large" cases use a synthetic details page with thousands of
+chapters. "allocs" counts memory blocks allocated by one call and still
+alive afterwards (the result objects); "peak" is the tracemalloc peak
+during that call.
+
+    python benchmarks/bench_parse.py
+    python benchmarks/bench_parse.py --backend bs4 --save baseline.json
+    python benchmarks/bench_parse.py --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from sources.asurascans import AsuraScansSource  # noqa: E402
+from sources.manganato import ManganatoSource  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# (case name, source class, method, args, fixture)
+CASES = [
+    ("asurascans.search", AsuraScansSource, "search", ("solo",), "asurascans_listing.html"),
+    ("asurascans.popular", AsuraScansSource, "get_popular", (1,), "asurascans_listing.html"),
+    ("asurascans.latest", AsuraScansSource, "get_latest", (1,), "asurascans_listing.html"),
+    ("asurascans.details", AsuraScansSource, "get_manga_details", ("solo-leveling",), "asurascans_details.html"),
+    ("asurascans.details_large", AsuraScansSource, "get_manga_details", ("solo-leveling",), "asurascans_details_large"),
+    ("asurascans.chapter", AsuraScansSource, "get_chapter_pages", ("solo-leveling-chapter-200",), "asurascans_chapter.html"),
+    ("manganato.search", ManganatoSource, "search", ("solo leveling",), "manganato_search.html"),
+    ("manganato.popular", ManganatoSource, "get_popular", (1,), "manganato_listing.html"),
+    ("manganato.latest", ManganatoSource, "get_latest", (1,), "manganato_listing.html"),
+    ("manganato.details", ManganatoSource, "get_manga_details", ("dr980474",), "manganato_details.html"),
+    ("manganato.details_large", ManganatoSource, "get_manga_details", ("dr980474",), "manganato_details_large"),
+    ("manganato.chapter", ManganatoSource, "get_chapter_pages", ("chapter-200",), "manganato_chapter.html"),
+]
+
+# Chapter <li> markup used to grow the recorded details pages
+_LARGE_ITEMS = {
+    "asurascans_details_large": (
+        "asurascans_details.html",
+        re.compile(r'(<ul class="clstyle">).*?(</ul>)', re.S),
+        '<li data-num="{n}"><div class="chbox"><div class="eph-num">'
+        '<a href="https://asuracomic.net/solo-leveling-chapter-{n}/">'
+        '<span class="chapternum">Chapter {n}</span>'
+        '<span class="chapterdate">March {d}, 2021</span></a></div></div></li>',
+    ),
+    "manganato_details_large": (
+        "manganato_details.html",
+        re.compile(r'(<ul class="row-content-chapter">).*?(</ul>)', re.S),
+        '<li class="a-h"><a rel="nofollow" class="chapter-name text-nowrap" '
+        'href="https://chapmanganato.to/manga-dr980474/chapter-{n}">Chapter {n}</a>'
+        '<span class="chapter-view text-nowrap">{n}</span>'
+        '<span class="chapter-time text-nowrap" title="Dec {d},2021 05:00">Dec {d},21</span></li>',
+    ),
+}
+
+
+def synthetic_details(name: str, chapters: int) -> str:
+    """Recorded details page with its chapter list replaced by `chapters` entries"""
+    fixture, pattern, item = _LARGE_ITEMS[name]
+    html = (FIXTURES / fixture).read_text(encoding="utf-8")
+    items = "\n".join(item.format(n=n, d=n % 28 + 1) for n in range(chapters, 0, -1))
+    return pattern.sub(lambda m: f"{m.group(1)}\n{items}\n{m.group(2)}", html, count=1)
+
+
+def load_fixture(name: str, chapters: int) -> str:
+    if name in _LARGE_ITEMS:
+        return synthetic_details(name, chapters)
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def make_source(cls, html: str):
+    source = cls()
+
+    async def fetch_page(url: str) -> str:
+        return html
+
+    source.fetch_page = fetch_page
+    return source
+
+
+def run_case(cls, method: str, args: tuple, html: str, repeat: int) -> dict:
+    source = make_source(cls, html)
+    # Bypass caching/coalescing so every run parses
+    fn = getattr(cls, method).__wrapped__
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(fn(source, *args))
+        items = len(result) if isinstance(result, list) else len(
+            getattr(result, "chapters", None) or getattr(result, "pages", [])
+        )
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            loop.run_until_complete(fn(source, *args))
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        kept = loop.run_until_complete(fn(source, *args))
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        del kept
+    finally:
+        loop.close()
+
+    diff = after.compare_to(before, "filename")
+    return {
+        "items": items,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "allocations": sum(max(stat.count_diff, 0) for stat in diff),
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print deltas against a saved run; return False on a timing regression"""
+    ok = True
+    print(f"\n{'case':<28} {'baseline':>10} {'current':>10} {'delta':>8}")
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<28} {'-':>10} {current['median_ms']:>9.2f}ms")
+            continue
+        delta = current["median_ms"] / base["median_ms"] - 1
+        flag = ""
+        if delta > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(
+            f"{name:<28} {base['median_ms']:>8.2f}ms {current['median_ms']:>8.2f}ms "
+            f"{delta:>+7.1%}{flag}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default=settings.PARSER_BACKEND, help="lxml or bs4")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--chapters", type=int, default=2500,
+                        help="chapters on the synthetic large details pages")
+    parser.add_argument("--filter", default="", help="only run cases containing this text")
+    parser.add_argument("--save", help="write results as JSON (a baseline)")
+    parser.add_argument("--compare", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    settings.PARSER_BACKEND = args.backend
+    print(f"backend={args.backend} repeat={args.repeat}")
+    print(f"{'case':<28} {'items':>6} {'median':>10} {'min':>10} {'allocs':>9} {'peak':>10}")
+
+    results = {}
+    for name, cls, method, call_args, fixture in CASES:
+        if args.filter not in name:
+            continue
+        html = load_fixture(fixture, args.chapters)
+        stats = run_case(cls, method, call_args, html, args.repeat)
+        results[name] = stats
+        print(
+            f"{name:<28} {stats['items']:>6} {stats['median_ms']:>8.2f}ms "
+            f"{stats['min_ms']:>8.2f}ms {stats['allocations']:>9} {stats['peak_kb']:>8.0f}KB"
+        )
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(
+            {"backend": args.backend, "chapters": args.chapters, "results": results},
+            indent=2,
+        ))
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Parse throughput with extraction offloaded to worker processes.
+
+Parses a synthetic large details page (see bench_parse.py) through
+BaseMangaSource.extract with many calls in flight, first inline and then
+with 1, 2, 4 ... worker processes up to the core count. Inline parsing
+is capped at one core; the pool should scale until it runs out of cores.
+
+    python benchmarks/bench_parse_pool.py
+    python benchmarks/bench_parse_pool.py --source asurascans --docs 64 --workers 0 2 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_parse import synthetic_details  # noqa: E402
+from config import settings  # noqa: E402
+from sources import parsepool  # noqa: E402
+from sources.asurascans import AsuraScansSource  # noqa: E402
+from sources.manganato import ManganatoSource  # noqa: E402
+
+SOURCES = {
+    "asurascans": (AsuraScansSource, "asurascans_details_large"),
+    "manganato": (ManganatoSource, "manganato_details_large"),
+}
+
+
+def default_workers() -> list:
+    cores = os.cpu_count() or 1
+    counts, n = [0], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+async def run(source, html: str, docs: int, workers: int) -> float:
+    settings.PARSE_OFFLOAD = workers > 0
+    settings.PARSE_WORKERS = workers
+    settings.PARSE_OFFLOAD_MIN_BYTES = 0
+    pool = parsepool.get_parse_pool()
+    if pool is not None:
+        await pool.warm()
+        await source.extract(source.details_extractor, html)
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(source.extract(source.details_extractor, html) for _ in range(docs))
+        )
+        return time.perf_counter() - start
+    finally:
+        parsepool.shutdown_parse_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=sorted(SOURCES), default="manganato")
+    parser.add_argument("--chapters", type=int, default=5000)
+    parser.add_argument("--docs", type=int, default=32, help="pages parsed per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers(),
+                        help="worker counts to run (0 = inline)")
+    args = parser.parse_args()
+
+    cls, fixture = SOURCES[args.source]
+    source = cls()
+    html = synthetic_details(fixture, args.chapters)
+    print(f"source={args.source} page={len(html) / 1024:.0f}KB docs={args.docs} "
+          f"cores={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'docs/s':>9} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        elapsed = asyncio.run(run(source, html, args.docs, workers))
+        rate = args.docs / elapsed
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8} {elapsed:>9.2f} {rate:>9.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
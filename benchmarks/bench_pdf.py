@@ -0,0 +1,100 @@
+"""Peak RSS of PDF assembly against chapter length.
+
+Compares the naive Pillow approach (open every page, then
+``save(..., save_all=True)``) with ``StreamingPdfWriter``. Each run happens
+in a fresh subprocess so ru_maxrss reflects only that run. Pages are
+synthetic long-strip JPEGs generated once into a temp directory.
+
+    python benchmarks/bench_pdf.py --pages 10 50 150
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_pages(directory: str, count: int, width: int, height: int) -> None:
+    from PIL import Image
+
+    for index in range(count):
+        path = os.path.join(directory, f"{index:04d}.jpg")
+        if os.path.exists(path):
+            continue
+        # Noise keeps the JPEGs realistically sized
+        img = Image.effect_noise((width, height), 64).convert("RGB")
+        img.save(path, "JPEG", quality=85)
+        img.close()
+
+
+def run_naive(paths, out: str) -> None:
+    from PIL import Image
+
+    images = [Image.open(p).convert("RGB") for p in paths]
+    images[0].save(out, "PDF", save_all=True, append_images=images[1:])
+
+
+def run_streaming(paths, out: str, reencode: bool) -> None:
+    from downloader.pdf import StreamingPdfWriter
+
+    writer = StreamingPdfWriter(out, reencode=reencode)
+    for p in paths:
+        with open(p, "rb") as f:
+            writer.add_image(f.read())
+    writer.close()
+
+
+def child(mode: str, directory: str, pages: int) -> None:
+    paths = sorted(os.path.join(directory, n) for n in os.listdir(directory))[:pages]
+    out = os.path.join(directory, f"out-{mode}.pdf.tmp")
+    start = time.perf_counter()
+    if mode == "naive":
+        run_naive(paths, out)
+    else:
+        run_streaming(paths, out, reencode=(mode == "reencode"))
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(out)
+    os.unlink(out)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.3f} {peak_kb} {size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 150])
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--modes", nargs="+", default=["naive", "streaming", "reencode"])
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "DIR", "PAGES"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, directory, pages = args.child
+        child(mode, directory, int(pages))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_pages(directory, max(args.pages), args.width, args.height)
+        print(f"{args.width}x{args.height} JPEG pages")
+        print(f"{'pages':>6} {'mode':<10} {'time':>9} {'peak RSS':>10} {'pdf size':>10}")
+        for pages in args.pages:
+            for mode in args.modes:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, directory, str(pages)],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()
+                elapsed, peak_kb, size = float(output[0]), int(output[1]), int(output[2])
+                print(
+                    f"{pages:>6} {mode:<10} {elapsed:>8.2f}s {peak_kb / 1024:>8.1f}MB "
+                    f"{size / 1024 / 1024:>8.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
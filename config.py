@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = "Manhwa API"
@@ -13,9 +13,38 @@ class Settings(BaseSettings):
     RATE_LIMIT: int = 100
     RATE_LIMIT_PERIOD: int = 60
     
+    # Upstream request budgets (requests per second, per host) and retries
+    HOST_RATE_LIMIT: float = 2.0
+    HOST_RATE_BURST: int = 5
+    HOST_RATE_LIMITS: Dict[str, float] = {}
+    # Image CDNs get their own, larger budget (separate from page scrapes)
+    IMAGE_HOST_RATE_LIMIT: float = 10.0
+    IMAGE_HOST_RATE_BURST: int = 20
+    RETRY_MAX_ATTEMPTS: int = 4
+    RETRY_BACKOFF_BASE: float = 1.0
+    RETRY_BACKOFF_MAX: float = 60.0
+    
     # Download settings
     DOWNLOAD_PATH: str = "./downloads"
     MAX_CONCURRENT_DOWNLOADS: int = 5
+    PDF_MAX_WIDTH: Optional[int] = None
+    PDF_MAX_PAGE_HEIGHT: int = 14400
+    PDF_JPEG_QUALITY: int = 85
+    PDF_REENCODE: bool = False
+    IMAGE_STORE_MAX_BYTES: int = 2 * 1024 ** 3
+    
+    # Bulk download job queue (persisted; unfinished jobs resume on startup)
+    DOWNLOAD_QUEUE_PATH: str = "./downloads/jobs.db"
+    DOWNLOAD_QUEUE_CONCURRENCY: int = 8
+    DOWNLOAD_QUEUE_PER_HOST: int = 4
+    DOWNLOAD_QUEUE_MAX_JOBS: int = 4
+    
+    # Image proxy (resized WebP variants; set the secret when running several workers)
+    IMAGE_PROXY_WIDTHS: List[int] = [150, 300, 600, 1080]
+    IMAGE_PROXY_QUALITY: int = 80
+    IMAGE_PROXY_CACHE_BYTES: int = 256 * 1024 ** 2
+    IMAGE_PROXY_MAX_DECODES: int = 2
+    IMAGE_PROXY_SECRET: Optional[str] = None
     
     # Supported sources
     ENABLED_SOURCES: List[str] = [
@@ -26,8 +55,87 @@ class Settings(BaseSettings):
         "mangadex"
     ]
     
+    # Per-source deadline for federated search (seconds)
+    FEDERATED_SEARCH_TIMEOUT: float = 10.0
+    
     # Request settings
     REQUEST_TIMEOUT: int = 30
+    SCRAPER_MAX_WORKERS: int = 16
+    SOURCE_MAX_CONCURRENCY: int = 4
+    # Listing pages in flight per batched listing fetch
+    LISTING_BATCH_CONCURRENCY: int = 4
+    
+    # Connection pool settings (HTTP/2 requires the optional h2 package)
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_WARM_POOLS: bool = False
+    
+    # Stored per-series chapter indexes (None = memory only)
+    CHAPTER_INDEX_PATH: Optional[str] = None
+    CHAPTER_INDEX_MAX_SERIES: int = 1000  # Indexes kept in memory (LRU)
+    
+    # Update watcher (polls get_latest; intervals in seconds)
+    WATCHER_ENABLED: bool = False
+    WATCHER_PAGES: int = 2
+    WATCHER_MIN_INTERVAL: float = 60
+    WATCHER_MAX_INTERVAL: float = 1800
+    WATCHER_MAX_SERIES: int = 1000  # Latest-chapter markers remembered per source
+    
+    # Local search catalog (SQLite FTS5; CATALOG_CRAWL_INTERVAL=0: no background crawl)
+    CATALOG_ENABLED: bool = False
+    CATALOG_PATH: str = "./catalog.db"
+    CATALOG_PAGE_SIZE: int = 24
+    CATALOG_MIN_SCORE: float = 0.5
+    CATALOG_CRAWL_PAGES: int = 5
+    CATALOG_CRAWL_INTERVAL: float = 0
+    CATALOG_DETAILS_PER_CRAWL: int = 50
+    CATALOG_DETAILS_MAX_AGE: float = 7 * 86400
+    
+    # Next-chapter prefetch (opt-in background work)
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_IMAGES: int = 3
+    PREFETCH_DELAY: float = 2.0
+    PREFETCH_MAX_INFLIGHT: int = 2
+    PREFETCH_MIN_FREE_SLOTS: int = 2
+    PREFETCH_MAX_IMAGE_DOWNLOADS: int = 4
+    PREFETCH_MAX_SERIES: int = 512
+    
+    # Per-call profiling (header-requested or sampled; dumps to PROFILE_DIR)
+    PROFILING_ENABLED: bool = False
+    PROFILE_HEADER: str = "X-Profile"
+    # The header is only honoured with this token in PROFILE_TOKEN_HEADER
+    PROFILE_TOKEN: Optional[str] = None
+    PROFILE_TOKEN_HEADER: str = "X-Profile-Token"
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_MODES: List[str] = ["cpu"]
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_DUMPS: int = 200  # Oldest profiles are deleted beyond this
+    PROFILE_TRACEBACK_DEPTH: int = 1
+    PROFILE_TOP_ALLOCATIONS: int = 50
+    
+    # HTML parsing ("lxml" or "bs4")
+    PARSER_BACKEND: str = "lxml"
+    
+    # Parse large pages in worker processes (PARSE_WORKERS=0: one per core)
+    PARSE_OFFLOAD: bool = False
+    PARSE_WORKERS: int = 0
+    PARSE_OFFLOAD_MIN_BYTES: int = 64 * 1024
+    PARSE_START_METHOD: str = "spawn"
+    
+    # Response cache (TTLs in seconds, per source method)
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_DISK_PATH: Optional[str] = None
+    CACHE_STALE_TTL: int = 300
+    CACHE_TTLS: Dict[str, int] = {
+        "search": 300,
+        "get_manga_details": 600,
+        "get_chapter_pages": 86400,
+        "get_popular": 120,
+        "get_latest": 60,
+    }
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     
     class Config:
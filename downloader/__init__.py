@@ -0,0 +1,9 @@
+from .engine import ChapterDownloader, download_chapter
+from .pdf import StreamingPdfWriter
+from .queue import DownloadQueue, FairScheduler, get_download_queue
+from .store import ImageStore, get_image_store
+
+__all__ = [
+    "ChapterDownloader", "DownloadQueue", "FairScheduler", "ImageStore",
+    "StreamingPdfWriter", "download_chapter", "get_download_queue", "get_image_store",
+]
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import re
+import shutil
+import zipfile
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from config import settings
+from models.schemas import ChapterPages, DownloadFormat, DownloadRequest, DownloadResponse
+from sources import get_source
+from sources.base import BaseMangaSource
+from .pdf import StreamingPdfWriter
+from .store import ImageStore, get_image_store
+
+_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif"}
+
+def safe_name(value: str) -> str:
+    """Turn a chapter ID (or URL) into a file-system safe name"""
+    return re.sub(r"[^\w.-]+", "_", value).strip("._") or "chapter"
+
+def page_filename(index: int, total: int, url: str) -> str:
+    """Zero-padded page file name that sorts in reading order"""
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext not in _IMAGE_EXTENSIONS:
+        ext = ".jpg"
+    return f"{index + 1:0{max(3, len(str(total)))}d}{ext}"
+
+# ============ Output sinks ============
+class ArchiveSink:
+    """CBZ/ZIP output; images are stored, not recompressed"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, path: str) -> None:
+        self._zip.write(path, name)
+
+    def close(self) -> None:
+        self._zip.close()
+
+class DirectorySink:
+    """Loose image files in a directory"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def add(self, name: str, path: str) -> None:
+        shutil.copyfile(path, os.path.join(self.path, name))
+
+    def close(self) -> None:
+        pass
+
+_SINKS = {
+    DownloadFormat.PDF: (StreamingPdfWriter, ".pdf"),
+    DownloadFormat.CBZ: (ArchiveSink, ".cbz"),
+    DownloadFormat.ZIP: (ArchiveSink, ".zip"),
+    DownloadFormat.IMAGES: (DirectorySink, ""),
+}
+
+# ============ Engine ============
+class ChapterDownloader:
+    """Fetch chapter images concurrently and stream them, in page order,
+    into the requested output format.
+
+    Images go through the shared ImageStore, so building another format
+    of an already fetched chapter reads from disk only. At most
+    ``max_concurrent`` images are fetched ahead of the writer.
+    """
+
+    def __init__(self, source: BaseMangaSource,
+                 max_concurrent: Optional[int] = None,
+                 download_path: Optional[str] = None,
+                 store: Optional[ImageStore] = None):
+        self.source = source
+        self.store = store or get_image_store()
+        self.max_concurrent = max(1, max_concurrent or settings.MAX_CONCURRENT_DOWNLOADS)
+        self.download_path = download_path or settings.DOWNLOAD_PATH
+
+    def output_path(self, chapter_id: str, fmt: DownloadFormat) -> str:
+        _, ext = _SINKS[fmt]
+        return os.path.join(
+            self.download_path, self.source.source_id, safe_name(chapter_id) + ext
+        )
+
+    async def fetch_image(self, url: str) -> str:
+        """Local path of one page image (fetched through the image store)"""
+        return await self.store.fetch(self.source, url)
+
+    async def iter_pages(self, urls: List[str]) -> AsyncIterator[Tuple[int, str]]:
+        """Yield (index, stored image path) in page order with bounded look-ahead"""
+        pending: Dict[int, asyncio.Task] = {}
+        next_index = 0
+        try:
+            for index in range(len(urls)):
+                while next_index < len(urls) and next_index < index + self.max_concurrent:
+                    pending[next_index] = asyncio.create_task(
+                        self.fetch_image(urls[next_index])
+                    )
+                    next_index += 1
+                yield index, await pending.pop(index)
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+    async def download(self, chapter: ChapterPages, fmt: DownloadFormat) -> DownloadResponse:
+        """Download every page of a chapter into the requested format"""
+        if fmt not in _SINKS:
+            return DownloadResponse(
+                status="failed", message=f"Format {fmt.value} is not supported yet"
+            )
+        if not chapter.pages:
+            return DownloadResponse(status="failed", message="Chapter has no pages")
+
+        path = self.output_path(chapter.chapter_id, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        sink_cls, _ = _SINKS[fmt]
+        sink = sink_cls(tmp_path)
+        done = False
+        try:
+            async with aclosing(self.iter_pages(chapter.pages)) as pages:
+                async for index, image_path in pages:
+                    name = page_filename(index, len(chapter.pages), chapter.pages[index])
+                    await asyncio.to_thread(sink.add, name, image_path)
+            await asyncio.to_thread(sink.close)
+            _replace(tmp_path, path)
+            done = True
+        except Exception as e:
+            print(f"Download error: {e}")
+            return DownloadResponse(status="failed", message=str(e))
+        finally:
+            # Also on cancellation: don't leave the sink open or a .part behind
+            if not done:
+                try:
+                    sink.close()
+                except Exception as e:
+                    print(f"Download cleanup error: {e}")
+                _remove(tmp_path)
+
+        return DownloadResponse(
+            status="completed",
+            message=f"Downloaded {len(chapter.pages)} pages",
+            download_url=path,
+            file_size=_output_size(path),
+        )
+
+def _output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    return os.path.getsize(path)
+
+def _replace(src: str, dst: str) -> None:
+    if os.path.isdir(dst):
+        shutil.rmtree(dst)
+    os.replace(src, dst)
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.unlink(path)
+
+async def download_chapter(request: DownloadRequest) -> DownloadResponse:
+    """Resolve a chapter's pages and download them in the requested format"""
+    source = get_source(request.source)
+    if source is None:
+        return DownloadResponse(status="failed", message=f"Unknown source: {request.source}")
+    try:
+        chapter = await source.get_chapter_pages(request.chapter_id)
+    except Exception as e:
+        return DownloadResponse(status="failed", message=f"Could not load chapter: {e}")
+    return await ChapterDownloader(source).download(chapter, request.format)
@@ -0,0 +1,145 @@
+import io
+from typing import BinaryIO, Dict, List, Optional
+from config import settings
+
+class StreamingPdfWriter:
+    """Write a PDF one image at a time.
+
+    Each page is written to disk as soon as it is added and only its
+    object offset is remembered, so memory use is bounded by a single
+    decoded image however long the chapter is. Baseline RGB/grayscale
+    JPEGs that need no resizing are embedded as-is (DCTDecode) without
+    being decoded at all.
+
+    Long-strip pages taller than ``max_page_height`` are split across
+    several PDF pages; the default matches the 14400 unit page-size limit
+    most PDF readers enforce.
+    """
+
+    def __init__(self, path: str, max_width: Optional[int] = None,
+                 max_page_height: Optional[int] = None,
+                 quality: Optional[int] = None,
+                 reencode: Optional[bool] = None):
+        self.path = path
+        self.max_width = max_width if max_width is not None else settings.PDF_MAX_WIDTH
+        self.max_page_height = max_page_height or settings.PDF_MAX_PAGE_HEIGHT
+        self.quality = quality or settings.PDF_JPEG_QUALITY
+        self.reencode = reencode if reencode is not None else settings.PDF_REENCODE
+        self.page_count = 0
+        self._offsets: Dict[int, int] = {}
+        self._kids: List[int] = []
+        self._next_obj = 3  # 1 = catalog, 2 = page tree (written last)
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    # Sink interface used by the download engine
+    def add(self, name: str, path: str) -> None:
+        with open(path, "rb") as f:
+            self.add_image(f.read())
+
+    def add_image(self, data: bytes) -> None:
+        """Append one source image as one or more PDF pages"""
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(data))
+        if self._can_passthrough(img):
+            colorspace = "DeviceGray" if img.mode == "L" else "DeviceRGB"
+            self._write_page(data, img.width, img.height, colorspace)
+            img.close()
+            return
+
+        if img.format == "JPEG" and self.max_width and img.width > self.max_width:
+            # Let libjpeg decode at reduced scale when we shrink anyway
+            draft_h = max(1, round(img.height * self.max_width / img.width))
+            img.draft("RGB", (self.max_width, draft_h))
+        rgb = _to_rgb(img)
+        if rgb is not img:
+            img.close()
+
+        if self.max_width and rgb.width > self.max_width:
+            height = max(1, round(rgb.height * self.max_width / rgb.width))
+            resized = rgb.resize((self.max_width, height), Image.LANCZOS)
+            rgb.close()
+            rgb = resized
+
+        for top in range(0, rgb.height, self.max_page_height):
+            segment = rgb.crop((0, top, rgb.width, min(top + self.max_page_height, rgb.height)))
+            buffer = io.BytesIO()
+            segment.save(buffer, "JPEG", quality=self.quality)
+            segment.close()
+            self._write_page(buffer.getvalue(), segment.width, segment.height, "DeviceRGB")
+        rgb.close()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        kids = " ".join(f"{obj} 0 R" for obj in self._kids)
+        self._write_obj(
+            2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._kids)} >>".encode()
+        )
+
+        xref_offset = self._file.tell()
+        size = self._next_obj
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self._offsets[obj]:010d} 00000 n \n" for obj in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode())
+        self._file.close()
+
+    def _can_passthrough(self, img) -> bool:
+        return (
+            not self.reencode
+            and img.format == "JPEG"
+            and img.mode in ("RGB", "L")
+            and not (self.max_width and img.width > self.max_width)
+            and img.height <= self.max_page_height
+        )
+
+    def _alloc(self) -> int:
+        obj = self._next_obj
+        self._next_obj += 1
+        return obj
+
+    def _write_obj(self, obj: int, body: bytes, stream: Optional[bytes] = None) -> None:
+        self._offsets[obj] = self._file.tell()
+        self._file.write(f"{obj} 0 obj\n".encode())
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def _write_page(self, jpeg: bytes, width: int, height: int, colorspace: str) -> None:
+        image_obj, content_obj, page_obj = self._alloc(), self._alloc(), self._alloc()
+        self._write_obj(image_obj, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /{colorspace} /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(jpeg)} >>"
+        ).encode(), jpeg)
+
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode()
+        self._write_obj(content_obj, f"<< /Length {len(content)} >>".encode(), content)
+
+        self._write_obj(page_obj, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /XObject << /Im0 {image_obj} 0 R >> >> "
+            f"/Contents {content_obj} 0 R >>"
+        ).encode())
+        self._kids.append(page_obj)
+        self.page_count += 1
+
+def _to_rgb(img):
+    """Flatten any image mode onto a white background as RGB"""
+    from PIL import Image
+
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        rgba.close()
+        return background
+    return img.convert("RGB")
@@ -0,0 +1,447 @@
+"""Persistent bulk download jobs.
+
+A job downloads a chapter range of one series. It is stored in SQLite as
+one DownloadRequest per chapter, together with each chapter's resolved
+page URLs and how many pages have been written. Jobs still unfinished
+when the process stops are picked up again by ``DownloadQueue.start``:
+finished chapters are skipped, and pages already fetched come back from
+the image store, so work resumes from the last finished page.
+
+Page fetches from all jobs share one ``FairScheduler``: a global cap on
+fetches in flight, handed out round-robin across image hosts so a long
+job on one site does not hold up jobs on another.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from config import settings
+from models.schemas import (
+    BulkDownloadRequest, ChapterPages, DownloadJobProgress, DownloadRequest
+)
+from sources import get_source
+from sources.base import BaseMangaSource
+from .engine import ChapterDownloader
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    request TEXT NOT NULL,
+    number REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    pages TEXT,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    output TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, position)
+);
+"""
+
+FINISHED = ("completed", "failed", "cancelled")
+
+# ============ Scheduling ============
+class FairScheduler:
+    """Concurrency cap shared by every job, fair across hosts.
+
+    At most ``limit`` slots are held at once and at most ``per_host`` per
+    host. Freed slots go to waiting hosts in turn, oldest waiter first.
+    """
+
+    def __init__(self, limit: int, per_host: int):
+        self.limit = limit
+        self.per_host = per_host
+        self._active: Dict[str, int] = {}
+        self._total = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    def _has_room(self, host: str) -> bool:
+        return self._total < self.limit and self._active.get(host, 0) < self.per_host
+
+    def _take(self, host: str) -> None:
+        self._total += 1
+        self._active[host] = self._active.get(host, 0) + 1
+
+    def _release(self, host: str) -> None:
+        self._total -= 1
+        self._active[host] -= 1
+        if not self._active[host]:
+            del self._active[host]
+        # Round-robin: each waiting host with room gets one slot in turn,
+        # and hosts that were served move to the back
+        for waiting in list(self._waiters):
+            if self._total >= self.limit:
+                break
+            queue = self._waiters[waiting]
+            while queue and self._has_room(waiting):
+                future = queue.popleft()
+                if not future.done():
+                    self._take(waiting)
+                    future.set_result(None)
+                    self._waiters.move_to_end(waiting)
+                    break
+            if not queue:
+                del self._waiters[waiting]
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        # Don't jump ahead of waiters that could use a free slot
+        if self._has_room(host) and not any(map(self._has_room, self._waiters)):
+            self._take(host)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(host, deque()).append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted just as we were cancelled; pass it on
+                    self._release(host)
+                raise
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._total,
+            "hosts": dict(self._active),
+            "waiting": {host: len(queue) for host, queue in self._waiters.items()},
+        }
+
+class _JobChapterDownloader(ChapterDownloader):
+    """ChapterDownloader whose fetches go through the queue's scheduler and
+    whose finished pages are reported to the job"""
+
+    def __init__(self, source: BaseMangaSource, scheduler: FairScheduler, on_page):
+        super().__init__(source)
+        self.scheduler = scheduler
+        self.on_page = on_page
+
+    async def fetch_image(self, url: str) -> str:
+        path = self.store.lookup(url)
+        if path is not None:
+            return path
+        async with self.scheduler.slot(urlsplit(url).hostname or ""):
+            return await self.store.fetch(self.source, url)
+
+    async def iter_pages(self, urls: List[str]) -> AsyncIterator[Tuple[int, str]]:
+        async with aclosing(super().iter_pages(urls)) as pages:
+            async for index, path in pages:
+                yield index, path
+                # The page has been written to the output by now
+                await self.on_page(index + 1)
+
+# ============ Storage ============
+class JobStore:
+    """SQLite persistence for jobs and their chapter tasks (blocking calls)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, request: BulkDownloadRequest,
+               tasks: List[Tuple[DownloadRequest, float]]) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, request, status, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, request.model_dump_json(), now, now),
+            )
+            self._db.executemany(
+                "INSERT INTO tasks (job_id, position, request, number) VALUES (?, ?, ?, ?)",
+                [(job_id, position, task.model_dump_json(), number)
+                 for position, (task, number) in enumerate(tasks)],
+            )
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    def update_task(self, job_id: str, position: int, **fields) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE tasks SET {columns} WHERE job_id = ? AND position = ?",
+                (*fields.values(), job_id, position),
+            )
+
+    def tasks(self, job_id: str) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT * FROM tasks WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+
+    def load(self, job_id: str) -> Tuple[Optional[sqlite3.Row], List[sqlite3.Row]]:
+        """A job and its tasks, read together"""
+        with self._lock:
+            job = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            tasks = self._db.execute(
+                "SELECT * FROM tasks WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return job, tasks
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+def _progress(job: sqlite3.Row, tasks: List[sqlite3.Row]) -> DownloadJobProgress:
+    return DownloadJobProgress(
+        job_id=job["id"],
+        status=job["status"],
+        chapters_total=len(tasks),
+        chapters_done=sum(task["status"] == "completed" for task in tasks),
+        chapters_failed=sum(task["status"] == "failed" for task in tasks),
+        error=job["error"],
+    )
+
+# ============ Queue ============
+class DownloadQueue:
+    """Runs bulk download jobs, persists their progress and publishes it"""
+
+    def __init__(self, path: Optional[str] = None,
+                 concurrency: Optional[int] = None,
+                 per_host: Optional[int] = None,
+                 max_jobs: Optional[int] = None):
+        self.store = JobStore(path or settings.DOWNLOAD_QUEUE_PATH)
+        self.scheduler = FairScheduler(
+            concurrency or settings.DOWNLOAD_QUEUE_CONCURRENCY,
+            per_host or settings.DOWNLOAD_QUEUE_PER_HOST,
+        )
+        self._job_slots = asyncio.Semaphore(max_jobs or settings.DOWNLOAD_QUEUE_MAX_JOBS)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._progress: Dict[str, DownloadJobProgress] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    # ============ Lifecycle ============
+    async def start(self) -> None:
+        """Resume jobs left unfinished by a previous run"""
+        for job_id in await asyncio.to_thread(self.store.unfinished):
+            await self._schedule(job_id)
+
+    async def stop(self) -> None:
+        """Stop running jobs; they stay unfinished and resume on next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ============ Jobs ============
+    async def submit(self, request: BulkDownloadRequest) -> DownloadJobProgress:
+        """Queue a chapter range of a series for download"""
+        source = get_source(request.source)
+        if source is None:
+            raise ValueError(f"Unknown source: {request.source}")
+        details = await source.get_manga_details(request.manga_id)
+        chapters = details.chapters
+        positions = chapters.number_index().range(request.start, request.end)
+        if not positions:
+            raise ValueError("No chapters in the requested range")
+        tasks = [
+            (
+                DownloadRequest(source=request.source, chapter_id=chapters.ids[position],
+                                format=request.format),
+                chapters.numbers[position],
+            )
+            for position in positions
+        ]
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self.store.create, job_id, request, tasks)
+        await self._schedule(job_id)
+        return self._progress[job_id]
+
+    async def cancel(self, job_id: str) -> bool:
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.to_thread(self.store.set_status, job_id, "cancelled")
+        self._publish(job_id, status="cancelled", chapter_id=None)
+        self._progress.pop(job_id, None)
+        return True
+
+    async def progress(self, job_id: str) -> Optional[DownloadJobProgress]:
+        if job_id in self._progress:
+            return self._progress[job_id]
+        job, tasks = await asyncio.to_thread(self.store.load, job_id)
+        if job is None:
+            return None
+        return _progress(job, tasks)
+
+    async def _schedule(self, job_id: str) -> None:
+        if job_id in self._tasks:
+            return
+        job, tasks = await asyncio.to_thread(self.store.load, job_id)
+        if job_id in self._tasks:
+            return
+        self._progress[job_id] = _progress(job, tasks)
+        task = asyncio.create_task(self._run_job(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._finish(job_id))
+
+    def _finish(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        progress = self._progress.get(job_id)
+        if progress is not None and progress.status in FINISHED:
+            del self._progress[job_id]
+
+    async def _run_job(self, job_id: str) -> None:
+        async with self._job_slots:
+            try:
+                await self._run_tasks(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never leave a job "running" with subscribers waiting on it
+                print(f"Download job error ({job_id}): {e}")
+                self._publish(job_id, status="failed", chapter_id=None, error=str(e))
+                try:
+                    await asyncio.to_thread(self.store.set_status, job_id, "failed")
+                except Exception as e:
+                    print(f"Download job error ({job_id}): {e}")
+
+    async def _run_tasks(self, job_id: str) -> None:
+        await asyncio.to_thread(self.store.set_status, job_id, "running")
+        self._publish(job_id, status="running")
+        for task in await asyncio.to_thread(self.store.tasks, job_id):
+            if task["status"] == "pending":
+                await self._run_task(job_id, task)
+        # A failed chapter doesn't stop the job; it ends failed if any did
+        job, tasks = await asyncio.to_thread(self.store.load, job_id)
+        counts = _progress(job, tasks)
+        status = "failed" if counts.chapters_failed else "completed"
+        await asyncio.to_thread(self.store.set_status, job_id, status)
+        self._publish(job_id, status=status, chapter_id=None,
+                      chapters_done=counts.chapters_done,
+                      chapters_failed=counts.chapters_failed)
+
+    async def _run_task(self, job_id: str, task: sqlite3.Row) -> None:
+        """Download one chapter, recording a failure on the task only"""
+        try:
+            await self._download_task(job_id, task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Download task error ({job_id}/{task['position']}): {e}")
+            await self._fail_task(job_id, task["position"], str(e))
+
+    async def _fail_task(self, job_id: str, position: int, error: str) -> None:
+        await asyncio.to_thread(
+            self.store.update_task, job_id, position, status="failed", error=error,
+        )
+        self._publish(job_id, chapters_failed=self._progress[job_id].chapters_failed + 1)
+
+    async def _download_task(self, job_id: str, task: sqlite3.Row) -> None:
+        request = DownloadRequest.model_validate_json(task["request"])
+        position = task["position"]
+        source = get_source(request.source)
+        if source is None:
+            raise ValueError(f"Unknown source: {request.source}")
+
+        if task["pages"] is None:
+            chapter = await source.get_chapter_pages(request.chapter_id)
+            pages = chapter.pages
+            await asyncio.to_thread(
+                self.store.update_task, job_id, position, pages=json.dumps(pages)
+            )
+        else:
+            # Resuming: keep the page URLs the earlier run was working from
+            pages = json.loads(task["pages"])
+        chapter = ChapterPages(
+            chapter_id=request.chapter_id,
+            chapter_number=task["number"],
+            pages=pages,
+            total_pages=len(pages),
+        )
+        self._publish(job_id, chapter_id=request.chapter_id,
+                      pages_done=task["pages_done"], pages_total=len(pages))
+
+        async def on_page(done: int) -> None:
+            if done > task["pages_done"]:
+                await asyncio.to_thread(
+                    self.store.update_task, job_id, position, pages_done=done
+                )
+            self._publish(job_id, pages_done=done)
+
+        response = await _JobChapterDownloader(source, self.scheduler, on_page).download(
+            chapter, request.format
+        )
+        progress = self._progress[job_id]
+        if response.status == "completed":
+            await asyncio.to_thread(
+                self.store.update_task, job_id, position,
+                status="completed", output=response.download_url, error=None,
+            )
+            self._publish(job_id, chapters_done=progress.chapters_done + 1)
+        else:
+            await self._fail_task(job_id, position, response.message)
+
+    # ============ Progress ============
+    def _publish(self, job_id: str, **changes) -> None:
+        progress = self._progress[job_id].model_copy(update=changes)
+        self._progress[job_id] = progress
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                # Progress is a snapshot; only the newest one matters
+                queue.get_nowait()
+            queue.put_nowait(progress)
+
+    async def subscribe(self, job_id: str, max_queue: int = 100) -> AsyncIterator[DownloadJobProgress]:
+        """Current progress of a job, then every update until it finishes"""
+        queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            progress = await self.progress(job_id)
+            if progress is None:
+                return
+            yield progress
+            while progress.status not in FINISHED:
+                progress = await queue.get()
+                yield progress
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+_download_queue: Optional[DownloadQueue] = None
+
+def get_download_queue() -> DownloadQueue:
+    """Get the shared download job queue"""
+    global _download_queue
+    if _download_queue is None:
+        _download_queue = DownloadQueue()
+    return _download_queue
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from typing import Optional
+import aiofiles
+from config import settings
+from sources.base import BaseMangaSource
+from sources.singleflight import SingleFlight
+
+_CHUNK = 1024 * 1024
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _atomic_write(path: str, data: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+class ImageStore:
+    """Content-addressed store for downloaded page images.
+
+    Layout under ``root``::
+
+        objects/ab/<sha256 of content>   image bytes, shared by every URL
+        refs/ab/<sha256 of URL>          content hash the URL resolved to
+        partial/<sha256 of URL>.part     interrupted download (+ .etag)
+
+    Interrupted downloads resume with an HTTP Range request (guarded by
+    If-Range when the server sent an ETag). Objects and refs are written
+    atomically, and objects are evicted least-recently-used once the
+    store grows past ``max_bytes``.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = root or os.path.join(settings.DOWNLOAD_PATH, ".store")
+        self.max_bytes = max_bytes or settings.IMAGE_STORE_MAX_BYTES
+        self._flight = SingleFlight()
+        # Source ID -> image downloads in progress
+        self._downloading: Counter = Counter()
+        self._size: Optional[int] = None
+        for name in ("objects", "refs", "partial"):
+            os.makedirs(os.path.join(self.root, name), exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _ref_path(self, url_key: str) -> str:
+        return os.path.join(self.root, "refs", url_key[:2], url_key)
+
+    def _partial_path(self, url_key: str) -> str:
+        return os.path.join(self.root, "partial", url_key + ".part")
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Path of the stored image for url, or None. Marks it recently used."""
+        ref = self._ref_path(_sha256(url))
+        try:
+            with open(ref) as f:
+                path = self._object_path(f.read().strip())
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def contains(self, url: str) -> bool:
+        return self.lookup(url) is not None
+
+    async def fetch(self, source: BaseMangaSource, url: str) -> str:
+        """Return the local path of url's image, downloading it if needed"""
+        path = self.lookup(url)
+        if path is not None:
+            return path
+        return await self._flight.do(url, lambda: self._counted_download(source, url))
+
+    def downloads_in_flight(self, source_id: str) -> int:
+        """How many images are being downloaded from a source right now"""
+        return self._downloading[source_id]
+
+    async def _counted_download(self, source: BaseMangaSource, url: str) -> str:
+        self._downloading[source.source_id] += 1
+        try:
+            return await self._download(source, url)
+        finally:
+            self._downloading[source.source_id] -= 1
+            if not self._downloading[source.source_id]:
+                del self._downloading[source.source_id]
+
+    async def _download(self, source: BaseMangaSource, url: str) -> str:
+        url_key = _sha256(url)
+        part = self._partial_path(url_key)
+        etag_path = part + ".etag"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if os.path.exists(etag_path):
+                with open(etag_path) as f:
+                    headers["If-Range"] = f.read().strip()
+
+        # Rate limit, retries and fetch metrics come from the source
+        response = await source.open_image(url, headers)
+        try:
+            if response.status_code == 416:
+                # Our partial no longer lines up with the remote file
+                await response.aclose()
+                self._discard_partial(part)
+                return await self._download(source, url)
+            response.raise_for_status()
+
+            resumed = offset and response.status_code == 206
+            if not resumed:
+                etag = response.headers.get("ETag")
+                if etag:
+                    _atomic_write(etag_path, etag)
+                elif os.path.exists(etag_path):
+                    os.unlink(etag_path)
+            async with aiofiles.open(part, "ab" if resumed else "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    await f.write(chunk)
+        finally:
+            await response.aclose()
+
+        digest = await asyncio.to_thread(_hash_file, part)
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(part)
+        else:
+            size = os.path.getsize(part)
+            os.replace(part, path)
+            await self._account(size)
+        _atomic_write(self._ref_path(url_key), digest)
+        if os.path.exists(etag_path):
+            os.unlink(etag_path)
+        return path
+
+    def _discard_partial(self, part: str) -> None:
+        for path in (part, part + ".etag"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    async def _account(self, added: int) -> None:
+        if self._size is None:
+            self._size = await asyncio.to_thread(self._scan_size)
+        else:
+            self._size += added
+        if self._size > self.max_bytes:
+            self._size = await asyncio.to_thread(self.evict)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for dirpath, _, files in os.walk(os.path.join(self.root, "objects")):
+            total += sum(os.path.getsize(os.path.join(dirpath, name)) for name in files)
+        return total
+
+    def evict(self, target: Optional[int] = None) -> int:
+        """Delete least-recently-used objects until the store fits target
+        (default 90% of max_bytes). Returns the remaining size."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        entries = []
+        for dirpath, _, files in os.walk(os.path.join(self.root, "objects")):
+            for name in files:
+                stat = os.stat(os.path.join(dirpath, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(dirpath, name)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+        # Refs to evicted objects are left behind; lookup() treats them as misses
+        return total
+
+_image_store: Optional[ImageStore] = None
+
+def get_image_store() -> ImageStore:
+    """Get the shared image store"""
+    global _image_store
+    if _image_store is None:
+        _image_store = ImageStore()
+    return _image_store
@@ -0,0 +1,5 @@
+from .proxy import ImageProxy, ImageVariant, get_image_proxy, proxy_url, sign, verify
+
+__all__ = [
+    "ImageProxy", "ImageVariant", "get_image_proxy", "proxy_url", "sign", "verify",
+]
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+from urllib.parse import urlencode
+from config import settings
+from downloader.store import ImageStore, get_image_store
+from sources.base import BaseMangaSource
+from sources.singleflight import SingleFlight
+
+# WebP cannot encode images taller or wider than this
+WEBP_MAX_SIDE = 16383
+
+@dataclass
+class ImageVariant:
+    data: bytes
+    media_type: str
+    etag: str
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    """Round a requested width up to the nearest configured size so that
+    similar requests share one cached variant"""
+    if width is None:
+        return None
+    for size in sorted(settings.IMAGE_PROXY_WIDTHS):
+        if size >= width:
+            return size
+    return max(settings.IMAGE_PROXY_WIDTHS)
+
+def transcode(path: str, width: Optional[int], quality: int) -> Tuple[bytes, str]:
+    """Resize the image at path to ``width`` (never enlarging) and encode
+    it as WebP, or JPEG when it is too tall for WebP. Blocking."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        target_w = min(width or img.width, img.width)
+        target_h = max(1, round(img.height * target_w / img.width))
+        if img.format == "JPEG":
+            # Let libjpeg decode at reduced scale
+            img.draft("RGB", (target_w, target_h))
+        frame = img.convert("RGBA" if _has_alpha(img) else "RGB")
+
+    if frame.size != (target_w, target_h):
+        resized = frame.resize((target_w, target_h), Image.LANCZOS)
+        frame.close()
+        frame = resized
+
+    buffer = io.BytesIO()
+    if max(frame.size) <= WEBP_MAX_SIDE:
+        frame.save(buffer, "WEBP", quality=quality, method=4)
+        media_type = "image/webp"
+    else:
+        if frame.mode != "RGB":
+            flat = frame.convert("RGB")
+            frame.close()
+            frame = flat
+        frame.save(buffer, "JPEG", quality=quality, optimize=True)
+        media_type = "image/jpeg"
+    frame.close()
+    return buffer.getvalue(), media_type
+
+def _has_alpha(img) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (
+        img.mode == "P" and "transparency" in img.info
+    )
+
+class VariantCache:
+    """In-memory LRU of encoded variants, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, ImageVariant]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[ImageVariant]:
+        variant = self._entries.get(key)
+        if variant is not None:
+            self._entries.move_to_end(key)
+        return variant
+
+    def set(self, key: Hashable, variant: ImageVariant) -> None:
+        if len(variant.data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old.data)
+        self._entries[key] = variant
+        self.size += len(variant.data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.data)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class ImageProxy:
+    """Serve source images resized and re-encoded for the client.
+
+    Originals come from the shared ImageStore, so a page already fetched
+    for a download is not fetched again. Decoding and encoding run in
+    worker threads, at most ``max_decodes`` at a time, and concurrent
+    requests for the same variant share one transcode.
+    """
+
+    def __init__(self, store: Optional[ImageStore] = None,
+                 max_bytes: Optional[int] = None,
+                 max_decodes: Optional[int] = None):
+        self.store = store or get_image_store()
+        self.cache = VariantCache(max_bytes or settings.IMAGE_PROXY_CACHE_BYTES)
+        self._decode_slots = asyncio.Semaphore(max_decodes or settings.IMAGE_PROXY_MAX_DECODES)
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, source: BaseMangaSource, url: str,
+                  width: Optional[int] = None,
+                  quality: Optional[int] = None) -> ImageVariant:
+        width = snap_width(width)
+        quality = quality or settings.IMAGE_PROXY_QUALITY
+        key = (url, width, quality)
+        variant = self.cache.get(key)
+        if variant is not None:
+            self.hits += 1
+            return variant
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._render(source, key))
+
+    async def _render(self, source: BaseMangaSource, key: Tuple[str, Optional[int], int]) -> ImageVariant:
+        url, width, quality = key
+        path = await self.store.fetch(source, url)
+        async with self._decode_slots:
+            data, media_type = await asyncio.to_thread(transcode, path, width, quality)
+        # Strong ETag: a hash of the bytes served, not of the request
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        variant = ImageVariant(data, media_type, etag)
+        self.cache.set(key, variant)
+        return variant
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.cache),
+            "bytes": self.cache.size,
+        }
+
+# ============ Signed proxy URLs ============
+_secret: Optional[bytes] = None
+
+def _key() -> bytes:
+    global _secret
+    if _secret is None:
+        # Without a configured secret, signatures only hold for this process
+        configured = settings.IMAGE_PROXY_SECRET
+        _secret = configured.encode() if configured else secrets.token_bytes(32)
+    return _secret
+
+def sign(source_id: str, url: str) -> str:
+    """Signature that lets the proxy fetch url for source_id"""
+    message = f"{source_id}\n{url}".encode()
+    return hmac.new(_key(), message, hashlib.sha256).hexdigest()[:32]
+
+def verify(source_id: str, url: str, signature: str) -> bool:
+    return hmac.compare_digest(sign(source_id, url), signature)
+
+def proxy_url(source_id: str, url: str, width: Optional[int] = None) -> str:
+    """API path that serves url through the proxy"""
+    query = {"url": url, "sig": sign(source_id, url)}
+    if width:
+        query["w"] = width
+    return f"{settings.API_PREFIX}/images/{source_id}?{urlencode(query)}"
+
+_image_proxy: Optional[ImageProxy] = None
+
+def get_image_proxy() -> ImageProxy:
+    """Get the shared image proxy"""
+    global _image_proxy
+    if _image_proxy is None:
+        _image_proxy = ImageProxy()
+    return _image_proxy
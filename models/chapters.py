@@ -0,0 +1,217 @@
+"""Column-oriented chapter lists.
+
+A long series has thousands of chapters, and a validated pydantic model
+per chapter costs more than scraping the page did. ``ChapterList`` keeps
+one column per ``Chapter`` field instead. Scraper output is trusted and
+stored without validation, and ``Chapter`` objects are only built when
+single items are read. Untrusted input (JSON from disk, API payloads)
+still goes through full ``Chapter`` validation.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+from pydantic_core import core_schema, to_json
+
+class ChapterRow(NamedTuple):
+    """One chapter as plain values, in Chapter field order"""
+    id: str
+    number: float
+    title: Optional[str]
+    url: str
+    release_date: Optional[str] = None
+    scanlator: Optional[str] = None
+
+FIELDS = ChapterRow._fields
+
+class ChapterList(Sequence):
+    """Immutable sequence of chapters stored as columns"""
+
+    __slots__ = (
+        "ids", "numbers", "titles", "urls", "release_dates", "scanlators", "_json", "_index"
+    )
+    COLUMNS = __slots__[:-2]
+
+    def __init__(self, rows: Iterable[Sequence[Any]] = ()):
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(FIELDS)
+        self.ids: List[str] = list(columns[0])
+        self.numbers = array("d", columns[1])
+        self.titles: List[Optional[str]] = list(columns[2])
+        self.urls: List[str] = list(columns[3])
+        self.release_dates: List[Optional[str]] = list(columns[4])
+        self.scanlators: List[Optional[str]] = list(columns[5])
+        self._json: Optional[bytes] = None
+        self._index: Optional[ChapterIndex] = None
+
+    def __copy__(self) -> "ChapterList":
+        return self  # Immutable, so copies can share it
+
+    def __deepcopy__(self, memo: dict) -> "ChapterList":
+        return self
+
+    @classmethod
+    def from_chapters(cls, chapters: Iterable[Any]) -> "ChapterList":
+        return cls(ChapterRow(*(getattr(ch, name) for name in FIELDS)) for ch in chapters)
+
+    def row(self, index: int) -> ChapterRow:
+        return ChapterRow(
+            self.ids[index], self.numbers[index], self.titles[index],
+            self.urls[index], self.release_dates[index], self.scanlators[index],
+        )
+
+    def rows(self) -> Iterator[ChapterRow]:
+        return map(ChapterRow._make, zip(
+            self.ids, self.numbers, self.titles,
+            self.urls, self.release_dates, self.scanlators,
+        ))
+
+    def positions(self) -> Dict[str, int]:
+        """Chapter ID -> position"""
+        return {ch_id: i for i, ch_id in enumerate(self.ids)}
+
+    def number_index(self) -> "ChapterIndex":
+        """Index by chapter number, built on first use and kept with the list"""
+        if self._index is None:
+            self._index = ChapterIndex(self)
+        return self._index
+
+    def take(self, positions: Iterable[int]) -> "ChapterList":
+        """New list of the chapters at the given positions"""
+        return ChapterList(self.row(i) for i in positions)
+
+    # ============ Sequence ============
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        from models.schemas import Chapter
+        return Chapter.model_construct(**self.row(index)._asdict())
+
+    def __iter__(self) -> Iterator[Any]:
+        from models.schemas import Chapter
+        construct = Chapter.model_construct
+        for row in self.rows():
+            yield construct(**row._asdict())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ChapterList):
+            return all(getattr(self, c) == getattr(other, c) for c in self.COLUMNS)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ChapterList({len(self)} chapters)"
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, c) for c in self.COLUMNS)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, column in zip(self.COLUMNS, state):
+            setattr(self, name, column)
+        self._json = None
+        self._index = None
+
+    # ============ Serialization ============
+    def to_list(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Chapters (or the [start:stop] slice) as plain dicts, like model_dump"""
+        window = slice(start, stop)
+        return [
+            {"id": ch_id, "number": number, "title": title, "url": url,
+             "release_date": release_date, "scanlator": scanlator}
+            for ch_id, number, title, url, release_date, scanlator in zip(
+                self.ids[window], self.numbers[window], self.titles[window],
+                self.urls[window], self.release_dates[window], self.scanlators[window],
+            )
+        ]
+
+    def to_json(self) -> bytes:
+        """JSON array of the chapters (UTF-8).
+
+        The list is immutable, so the result is computed once and reused;
+        a cached MangaDetails is re-served without re-encoding its chapters.
+        """
+        if self._json is None:
+            self._json = to_json(self.to_list())
+        return self._json
+
+    # ============ Pydantic integration ============
+    @classmethod
+    def _validate(cls, value: Any) -> "ChapterList":
+        if isinstance(value, ChapterList):
+            return value  # Trusted, built by a source
+        from models.schemas import Chapter
+        return cls.from_chapters(
+            ch if isinstance(ch, Chapter) else Chapter.model_validate(ch) for ch in value
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value: value.to_list()
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> Dict[str, Any]:
+        from models.schemas import Chapter
+        return handler(core_schema.list_schema(Chapter.__pydantic_core_schema__))
+
+class ChapterIndex:
+    """Chapter positions sorted by number, for O(log n) lookups.
+
+    Sources list chapters newest first and numbers can repeat (one entry
+    per scanlator), so lookups return positions into the ChapterList;
+    equal numbers keep their list order.
+    """
+
+    def __init__(self, chapters: ChapterList):
+        self.chapters = chapters
+        self.order = sorted(range(len(chapters)), key=chapters.numbers.__getitem__)
+        self.numbers = array("d", (chapters.numbers[i] for i in self.order))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def find(self, number: float) -> List[int]:
+        """Positions of every chapter numbered exactly ``number``"""
+        lo = bisect_left(self.numbers, number)
+        hi = bisect_right(self.numbers, number, lo)
+        return self.order[lo:hi]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[int]:
+        """Positions of chapters numbered within [start, end], ascending"""
+        lo = 0 if start is None else bisect_left(self.numbers, start)
+        hi = len(self.numbers) if end is None else bisect_right(self.numbers, end)
+        return self.order[lo:max(lo, hi)]
+
+    def next(self, number: float) -> Optional[int]:
+        """Position of the first chapter numbered above ``number``"""
+        i = bisect_right(self.numbers, number)
+        return self.order[i] if i < len(self.order) else None
+
+    def previous(self, number: float) -> Optional[int]:
+        """Position of the last chapter numbered below ``number``"""
+        i = bisect_left(self.numbers, number)
+        return self.order[i - 1] if i > 0 else None
+
+def dump_json(model: Any) -> bytes:
+    """Fast ``model.model_dump_json()`` for models with ChapterList fields.
+
+    Returns UTF-8 bytes ready to send. Chapter lists are spliced in from
+    their cached ``to_json()`` instead of being serialized item by item;
+    they come last in the output object.
+    """
+    lists = {
+        name: value for name, value in model.__dict__.items()
+        if isinstance(value, ChapterList)
+    }
+    if not lists:
+        return model.model_dump_json().encode()
+    body = model.model_dump_json(exclude=set(lists)).encode()[1:-1]
+    fields = [to_json(name) + b":" + value.to_json() for name, value in lists.items()]
+    return b"{" + b",".join(([body] if body else []) + fields) + b"}"
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from enum import Enum
 from datetime import datetime
+from models.chapters import ChapterList
 
 # ============ Enums ============
 class SourceType(str, Enum):
@@ -71,7 +72,7 @@ class MangaDetails(BaseModel):
     views: Optional[int] = None
     source: str
     url: str
-    chapters: List[Chapter] = []
+    chapters: ChapterList = Field(default_factory=ChapterList)
     total_chapters: int = 0
 
 class DownloadRequest(BaseModel):
@@ -85,6 +86,24 @@ class DownloadResponse(BaseModel):
     download_url: Optional[str] = None
     file_size: Optional[int] = None
 
+class BulkDownloadRequest(BaseModel):
+    source: str
+    manga_id: str
+    start: Optional[float] = None  # Lowest chapter number (inclusive)
+    end: Optional[float] = None  # Highest chapter number (inclusive)
+    format: DownloadFormat = DownloadFormat.PDF
+
+class DownloadJobProgress(BaseModel):
+    job_id: str
+    status: str  # "queued", "running", "completed", "failed" or "cancelled"
+    chapters_total: int
+    chapters_done: int = 0
+    chapters_failed: int = 0
+    chapter_id: Optional[str] = None  # Chapter currently downloading
+    pages_done: int = 0
+    pages_total: int = 0
+    error: Optional[str] = None
+
 class PopularManga(BaseModel):
     id: str
     title: str
@@ -94,6 +113,32 @@ class PopularManga(BaseModel):
     rating: Optional[float] = None
     views: Optional[int] = None
 
+class SourceSearchBatch(BaseModel):
+    source: str
+    status: str  # "ok", "timeout" or "error"
+    results: List[SearchResult] = []
+    elapsed_ms: float
+    error: Optional[str] = None
+
+class MergedSearchResult(BaseModel):
+    title: str
+    normalized_title: str
+    cover: Optional[str] = None
+    results: List[SearchResult]  # One entry per source that has the title
+
+class FederatedSearchResponse(BaseModel):
+    query: str
+    results: List[MergedSearchResult]
+    sources: List[SourceSearchBatch]  # Per-source status (results omitted)
+
+class MangaUpdateEvent(BaseModel):
+    source: str
+    manga_id: str
+    title: str
+    latest_chapter: Optional[str] = None
+    new_chapters: ChapterList = Field(default_factory=ChapterList)
+    detected_at: datetime
+
 # ============ API Responses ============
 class APIResponse(BaseModel):
     success: bool = True
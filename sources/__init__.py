@@ -1,23 +1,80 @@
-from typing import Dict, Optional
-from .base import BaseMangaSource
-from .asurascans import AsuraScansSource
-from .manganato import ManganatoSource
-
-# Registry of all available sources
-SOURCES: Dict[str, BaseMangaSource] = {
-    "asurascans": AsuraScansSource(),
-    "manganato": ManganatoSource(),
+import asyncio
+import importlib
+from typing import Dict, Iterator, Mapping, Optional
+from config import settings
+from .base import BaseMangaSource, shutdown_scrape_executor
+from .parsepool import get_parse_pool, shutdown_parse_pool
+
+# Registry of all available sources ("module:Class", imported on first use)
+SOURCE_CLASSES: Dict[str, str] = {
+    "asurascans": "sources.asurascans:AsuraScansSource",
+    "manganato": "sources.manganato:ManganatoSource",
     # Add more sources here
 }
 
+class SourceRegistry(Mapping):
+    """Read-only mapping of enabled source IDs to source instances.
+
+    A source's module is imported and its instance created the first time
+    it is looked up. Only IDs listed in ENABLED_SOURCES are exposed.
+    """
+
+    def __init__(self, classes: Dict[str, str]):
+        self._classes = classes
+        self._instances: Dict[str, BaseMangaSource] = {}
+
+    def _enabled(self) -> list:
+        enabled = {source_id.lower() for source_id in settings.ENABLED_SOURCES}
+        return [source_id for source_id in self._classes if source_id in enabled]
+
+    def __getitem__(self, source_id: str) -> BaseMangaSource:
+        source = self._instances.get(source_id)
+        if source is not None:
+            return source
+        if source_id not in self._enabled():
+            raise KeyError(source_id)
+        module_name, class_name = self._classes[source_id].split(":")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        return self._instances.setdefault(source_id, cls())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._enabled())
+
+    def __len__(self) -> int:
+        return len(self._enabled())
+
+    def loaded(self) -> Dict[str, BaseMangaSource]:
+        """Sources that have already been created"""
+        return dict(self._instances)
+
+SOURCES = SourceRegistry(SOURCE_CLASSES)
+
 def get_source(source_id: str) -> Optional[BaseMangaSource]:
     """Get a source by its ID"""
     return SOURCES.get(source_id.lower())
 
-def get_all_sources() -> Dict[str, BaseMangaSource]:
+def get_all_sources() -> Mapping[str, BaseMangaSource]:
     """Get all available sources"""
     return SOURCES
 
 def list_sources() -> list:
     """List all source IDs"""
     return list(SOURCES.keys())
+
+async def startup_sources() -> None:
+    """Open connection pools (call on app startup).
+
+    Sources are still created lazily; with HTTP_WARM_POOLS every enabled
+    source is created up front so its pools can be warmed.
+    """
+    sources = SOURCES if settings.HTTP_WARM_POOLS else SOURCES.loaded()
+    await asyncio.gather(*(source.startup() for source in sources.values()))
+    pool = get_parse_pool()
+    if pool is not None:
+        await pool.warm()
+
+async def shutdown_sources() -> None:
+    """Close connection pools for all sources (call on app shutdown)"""
+    await asyncio.gather(*(source.shutdown() for source in SOURCES.loaded().values()))
+    shutdown_scrape_executor()
+    shutdown_parse_pool()
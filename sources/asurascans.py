@@ -2,12 +2,89 @@ import re
 from typing import List
 from urllib.parse import urljoin, quote
 from .base import BaseMangaSource
+from .parsing import extractor
 from models.schemas import (
-    SearchResult, MangaDetails, Chapter, ChapterPages, 
+    SearchResult, MangaDetails, ChapterPages,
     PopularManga, MangaStatus
 )
+from models.chapters import ChapterList, ChapterRow
+
+# ============ Extractors ============
+@extractor(".listupd")
+def extract_listing(p, root) -> List[dict]:
+    """Manga cards from search, popular and latest pages"""
+    records = []
+    for item in p.select(root, ".listupd .bs"):
+        link = p.select_one(item, "a")
+        img = p.select_one(item, "img")
+        title_elem = p.select_one(item, ".tt")
+        chapter = p.select_one(item, ".epxs")
+        rating = p.select_one(item, ".rating .num")
+        
+        if link is not None and title_elem is not None:
+            records.append({
+                "url": p.attr(link, "href") or "",
+                "title": p.text(title_elem),
+                "cover": p.attr(img, "src") if img is not None else None,
+                "latest_chapter": p.text(chapter) if chapter is not None else None,
+                "rating": p.text(rating) if rating is not None else None,
+            })
+    return records
+
+@extractor(".entry-title", ".thumb", ".entry-content", ".infox", ".mgen", "#chapterlist")
+def extract_details(p, root) -> dict:
+    """Series metadata and chapter list"""
+    title = p.select_one(root, ".entry-title")
+    cover = p.select_one(root, ".thumb img")
+    desc = p.select_one(root, ".entry-content[itemprop='description']")
+    
+    info = []
+    for item in p.select(root, ".infox .fmed"):
+        label = p.select_one(item, "b")
+        value = p.select_one(item, "span")
+        if label is not None and value is not None:
+            info.append((p.text(label).lower(), p.text(value)))
+    
+    chapters = []
+    for ch in p.select(root, "#chapterlist li"):
+        ch_link = p.select_one(ch, "a")
+        ch_num = p.select_one(ch, ".chapternum")
+        ch_date = p.select_one(ch, ".chapterdate")
+        
+        if ch_link is not None:
+            chapters.append({
+                "url": p.attr(ch_link, "href") or "",
+                "label": p.text(ch_num) if ch_num is not None else None,
+                "release_date": p.text(ch_date) if ch_date is not None else None,
+            })
+    
+    return {
+        "title": p.text(title) if title is not None else None,
+        "cover": p.attr(cover, "src") if cover is not None else None,
+        "description": p.text(desc) if desc is not None else None,
+        "info": info,
+        "genres": [p.text(g) for g in p.select(root, ".mgen a")],
+        "chapters": chapters,
+    }
+
+@extractor("#readerarea", ".entry-title")
+def extract_chapter_pages(p, root) -> dict:
+    """Reader image URLs and chapter heading"""
+    pages = []
+    for img in p.select(root, "#readerarea img"):
+        src = p.attr(img, "src") or p.attr(img, "data-src")
+        if src and not "logo" in src.lower():
+            pages.append(src)
+    
+    title = p.select_one(root, ".entry-title")
+    return {
+        "title": p.text(title) if title is not None else None,
+        "pages": pages,
+    }
 
 class AsuraScansSource(BaseMangaSource):
+    details_extractor = staticmethod(extract_details)
+    
     def __init__(self):
         super().__init__()
         self.name = "Asura Scans"
@@ -19,32 +96,8 @@ class AsuraScansSource(BaseMangaSource):
         """Search for manga on Asura Scans"""
         try:
             url = f"{self.base_url}/?s={quote(query)}"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            results = []
-            manga_items = soup.select(".listupd .bs")
-            
-            for item in manga_items:
-                link = item.select_one("a")
-                img = item.select_one("img")
-                title_elem = item.select_one(".tt")
-                chapter = item.select_one(".epxs")
-                
-                if link and title_elem:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(SearchResult(
-                        id=manga_id,
-                        title=title_elem.get_text(strip=True),
-                        cover=img.get("src") if img else None,
-                        url=manga_url,
-                        source="asurascans",
-                        latest_chapter=chapter.get_text(strip=True) if chapter else None
-                    ))
-            
-            return results
+            html = await self.fetch_page(url)
+            return self._to_search_results(await self.extract(extract_listing, html))
         except Exception as e:
             print(f"Search error: {e}")
             return []
@@ -52,76 +105,11 @@ class AsuraScansSource(BaseMangaSource):
     async def get_manga_details(self, manga_id: str) -> MangaDetails:
         """Get manga details from Asura Scans"""
         try:
-            url = f"{self.base_url}/manga/{manga_id}/"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            # Extract info
-            title = soup.select_one(".entry-title")
-            cover = soup.select_one(".thumb img")
-            desc = soup.select_one(".entry-content[itemprop='description']")
-            
-            # Extract metadata
-            info_items = soup.select(".infox .fmed")
-            author = artist = status = None
-            genres = []
-            
-            for item in info_items:
-                label = item.select_one("b")
-                value = item.select_one("span")
-                if label and value:
-                    label_text = label.get_text(strip=True).lower()
-                    value_text = value.get_text(strip=True)
-                    
-                    if "author" in label_text:
-                        author = value_text
-                    elif "artist" in label_text:
-                        artist = value_text
-                    elif "status" in label_text:
-                        status = self._parse_status(value_text)
-            
-            # Extract genres
-            genre_links = soup.select(".mgen a")
-            genres = [g.get_text(strip=True) for g in genre_links]
-            
-            # Extract chapters
-            chapters = []
-            chapter_items = soup.select("#chapterlist li")
-            
-            for ch in chapter_items:
-                ch_link = ch.select_one("a")
-                ch_num = ch.select_one(".chapternum")
-                ch_date = ch.select_one(".chapterdate")
-                
-                if ch_link:
-                    ch_url = ch_link.get("href", "")
-                    ch_id = self._extract_chapter_id(ch_url)
-                    ch_number = self._extract_chapter_number(
-                        ch_num.get_text(strip=True) if ch_num else ""
-                    )
-                    
-                    chapters.append(Chapter(
-                        id=ch_id,
-                        number=ch_number,
-                        title=ch_num.get_text(strip=True) if ch_num else None,
-                        url=ch_url,
-                        release_date=ch_date.get_text(strip=True) if ch_date else None
-                    ))
-            
-            return MangaDetails(
-                id=manga_id,
-                title=title.get_text(strip=True) if title else manga_id,
-                cover=cover.get("src") if cover else None,
-                description=desc.get_text(strip=True) if desc else None,
-                author=author,
-                artist=artist,
-                status=status,
-                genres=genres,
-                source="asurascans",
-                url=url,
-                chapters=chapters,
-                total_chapters=len(chapters)
-            )
+            url = self.details_url(manga_id)
+            html = await self.fetch_page(url)
+            record = await self.extract(self.details_extractor, html)
+            chapters = ChapterList(self.chapter_row(ch) for ch in record["chapters"])
+            return self.build_details(manga_id, url, record, chapters)
         except Exception as e:
             print(f"Details error: {e}")
             raise
@@ -130,30 +118,20 @@ class AsuraScansSource(BaseMangaSource):
         """Get chapter pages from Asura Scans"""
         try:
             url = f"{self.base_url}/{chapter_id}/"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            # Extract images
-            pages = []
-            img_containers = soup.select("#readerarea img")
-            
-            for img in img_containers:
-                src = img.get("src") or img.get("data-src")
-                if src and not "logo" in src.lower():
-                    pages.append(src)
+            html = await self.fetch_page(url)
+            record = await self.extract(extract_chapter_pages, html)
             
-            # Extract chapter info
-            title = soup.select_one(".entry-title")
+            title = record["title"]
             ch_number = self._extract_chapter_number(
-                title.get_text(strip=True) if title else chapter_id
+                title if title is not None else chapter_id
             )
             
             return ChapterPages(
                 chapter_id=chapter_id,
                 chapter_number=ch_number,
-                title=title.get_text(strip=True) if title else None,
-                pages=pages,
-                total_pages=len(pages)
+                title=title,
+                pages=record["pages"],
+                total_pages=len(record["pages"])
             )
         except Exception as e:
             print(f"Chapter pages error: {e}")
@@ -163,30 +141,18 @@ class AsuraScansSource(BaseMangaSource):
         """Get popular manga"""
         try:
             url = f"{self.base_url}/manga/?page={page}&order=popular"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
+            html = await self.fetch_page(url)
             
             results = []
-            manga_items = soup.select(".listupd .bs")
-            
-            for item in manga_items:
-                link = item.select_one("a")
-                img = item.select_one("img")
-                title_elem = item.select_one(".tt")
-                rating = item.select_one(".rating .num")
-                
-                if link and title_elem:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(PopularManga(
-                        id=manga_id,
-                        title=title_elem.get_text(strip=True),
-                        cover=img.get("src") if img else "",
-                        url=manga_url,
-                        source="asurascans",
-                        rating=float(rating.get_text(strip=True)) if rating else None
-                    ))
+            for item in await self.extract(extract_listing, html):
+                results.append(PopularManga(
+                    id=self._extract_id(item["url"]),
+                    title=item["title"],
+                    cover=item["cover"] or "",
+                    url=item["url"],
+                    source="asurascans",
+                    rating=float(item["rating"]) if item["rating"] is not None else None
+                ))
             
             return results
         except Exception as e:
@@ -197,37 +163,69 @@ class AsuraScansSource(BaseMangaSource):
         """Get latest updated manga"""
         try:
             url = f"{self.base_url}/manga/?page={page}&order=update"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            results = []
-            manga_items = soup.select(".listupd .bs")
-            
-            for item in manga_items:
-                link = item.select_one("a")
-                img = item.select_one("img")
-                title_elem = item.select_one(".tt")
-                chapter = item.select_one(".epxs")
-                
-                if link and title_elem:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(SearchResult(
-                        id=manga_id,
-                        title=title_elem.get_text(strip=True),
-                        cover=img.get("src") if img else None,
-                        url=manga_url,
-                        source="asurascans",
-                        latest_chapter=chapter.get_text(strip=True) if chapter else None
-                    ))
-            
-            return results
+            html = await self.fetch_page(url)
+            return self._to_search_results(await self.extract(extract_listing, html))
         except Exception as e:
             print(f"Latest error: {e}")
             return []
     
     # ============ Helper Methods ============
+    def _to_search_results(self, records: List[dict]) -> List[SearchResult]:
+        return [
+            SearchResult(
+                id=self._extract_id(item["url"]),
+                title=item["title"],
+                cover=item["cover"],
+                url=item["url"],
+                source="asurascans",
+                latest_chapter=item["latest_chapter"]
+            )
+            for item in records
+        ]
+    
+    def details_url(self, manga_id: str) -> str:
+        return f"{self.base_url}/manga/{manga_id}/"
+    
+    def build_details(self, manga_id: str, url: str, record: dict,
+                      chapters: ChapterList) -> MangaDetails:
+        # Extract metadata
+        author = artist = status = None
+        for label_text, value_text in record["info"]:
+            if "author" in label_text:
+                author = value_text
+            elif "artist" in label_text:
+                artist = value_text
+            elif "status" in label_text:
+                status = self._parse_status(value_text)
+        
+        return MangaDetails(
+            id=manga_id,
+            title=record["title"] if record["title"] is not None else manga_id,
+            cover=record["cover"],
+            description=record["description"],
+            author=author,
+            artist=artist,
+            status=status,
+            genres=record["genres"],
+            source="asurascans",
+            url=url,
+            chapters=chapters,
+            total_chapters=len(chapters)
+        )
+    
+    def chapter_record_id(self, record: dict) -> str:
+        return self._extract_chapter_id(record["url"])
+    
+    def chapter_row(self, record: dict) -> ChapterRow:
+        label = record["label"]
+        return ChapterRow(
+            id=self.chapter_record_id(record),
+            number=self._extract_chapter_number(label or ""),
+            title=label,
+            url=record["url"],
+            release_date=record["release_date"]
+        )
+    
     def _extract_id(self, url: str) -> str:
         """Extract manga ID from URL"""
         match = re.search(r'/manga/([^/]+)', url)
@@ -1,16 +1,135 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Tuple
+)
+from urllib.parse import urlsplit
+from pydantic import BaseModel
+import functools
+import inspect
+import threading
+import time
 import httpx
-import cloudscraper
-from bs4 import BeautifulSoup
 import asyncio
+from config import settings
 from models.schemas import (
-    SearchResult, MangaDetails, Chapter, ChapterPages, PopularManga
+    SearchResult, MangaDetails, ChapterPages, PopularManga
+)
+from models.chapters import ChapterList, ChapterRow
+from .cache import get_response_cache
+from .catalog import get_catalog
+from .singleflight import single_flight
+from .parsing import run_extractor
+from .parsepool import get_parse_pool
+from .ratelimit import HostLimiter, get_rate_limiter
+from .prefetch import get_prefetcher
+from . import metrics, profiling
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Source methods that go through the shared scrape pipeline (caching etc.)
+SCRAPE_METHODS = (
+    "search", "get_manga_details", "get_chapter_pages", "get_popular", "get_latest"
 )
 
+# Paged listings that can be fetched in batches (see iter_listing)
+LISTING_METHODS = ("get_popular", "get_latest")
+
+# Marks a _run_scrape call that did not run the scrape itself
+_NOT_FETCHED = object()
+
+# Shared, bounded pool for blocking cloudscraper requests
+_scrape_executor: Optional[ThreadPoolExecutor] = None
+
+def get_scrape_executor() -> ThreadPoolExecutor:
+    """Get the thread pool used for blocking Cloudflare fetches"""
+    global _scrape_executor
+    if _scrape_executor is None:
+        _scrape_executor = ThreadPoolExecutor(
+            max_workers=settings.SCRAPER_MAX_WORKERS,
+            thread_name_prefix="scraper",
+        )
+    return _scrape_executor
+
+def shutdown_scrape_executor() -> None:
+    """Stop the Cloudflare fetch thread pool"""
+    global _scrape_executor
+    if _scrape_executor is not None:
+        _scrape_executor.shutdown(wait=False)
+        _scrape_executor = None
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+@dataclass
+class ConditionalResponse:
+    """Result of a conditional (ETag / If-Modified-Since) fetch"""
+    not_modified: bool
+    text: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+@dataclass
+class ListingPage:
+    """One page of a batched listing fetch"""
+    page: int
+    items: List[Any]  # Entries not already returned from another page
+    duplicates: int = 0
+    error: Optional[str] = None
+
+def _response_size(response: Any) -> int:
+    """Bytes received, for metrics (Content-Length when the server sent it)"""
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    try:
+        return len(response.content)
+    except (AttributeError, httpx.ResponseNotRead):
+        # A test double, or a streamed body the caller has yet to read
+        return 0
+
+def _copy_result(result: Any) -> Any:
+    """Shallow copy of a shared scrape result: a caller may reassign fields
+    or reorder the list, but nested values (genres, pages, chapters) stay
+    shared and must not be changed in place"""
+    if isinstance(result, list):
+        return [_copy_result(item) for item in result]
+    if isinstance(result, BaseModel):
+        return result.model_copy()
+    return result
+
+def _bind_args(fn: Callable, args: tuple, kwargs: dict) -> Tuple[Any, ...]:
+    """Normalize call arguments (minus self) so equal calls get equal keys"""
+    bound = inspect.signature(fn).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    return tuple(bound.arguments.values())[1:]
+
+def _scrape_method(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        return await self._run_scrape(name, fn, _bind_args(fn, args, kwargs))
+    return wrapper
+
 class BaseMangaSource(ABC):
     """Abstract base class for all manga sources"""
     
+    # Extraction function for series pages (see details_url/build_details)
+    details_extractor: Optional[Callable] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in SCRAPE_METHODS:
+            fn = cls.__dict__.get(name)
+            if fn is not None and not getattr(fn, "__isabstractmethod__", False):
+                setattr(cls, name, _scrape_method(name, fn))
+    
     def __init__(self):
         self.name: str = ""
         self.base_url: str = ""
@@ -21,25 +140,346 @@ class BaseMangaSource(ABC):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
         }
-        self.scraper = cloudscraper.create_scraper()
+        # One cloudscraper session per thread: requests sessions are not thread-safe
+        self._scrapers = threading.local()
+        self._all_scrapers: List[Any] = []
+        self._scraper_lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        # Cloudflare-protected sites must go through cloudscraper
+        self.use_cloudscraper: bool = True
+        self.max_concurrency: int = settings.SOURCE_MAX_CONCURRENCY
+        self._fetch_semaphore: Optional[asyncio.Semaphore] = None
+        self._fetches_in_flight = 0
+    
+    @property
+    def scraper(self):
+        """The calling thread's cloudscraper session, created on first use"""
+        scraper = getattr(self._scrapers, "session", None)
+        if scraper is None:
+            import cloudscraper
+            scraper = cloudscraper.create_scraper()
+            self._configure_scraper_pool(scraper)
+            self._scrapers.session = scraper
+            with self._scraper_lock:
+                self._all_scrapers.append(scraper)
+        return scraper
+    
+    def _configure_scraper_pool(self, scraper) -> None:
+        """Resize the cloudscraper connection pools to match our settings"""
+        for adapter in scraper.adapters.values():
+            adapter.poolmanager.clear()
+            adapter._pool_connections = settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+            adapter._pool_maxsize = settings.HTTP_MAX_CONNECTIONS
+            adapter.init_poolmanager(
+                settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                settings.HTTP_MAX_CONNECTIONS,
+            )
+    
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(settings.REQUEST_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=settings.HTTP2_ENABLED and _http2_available(),
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived pooled HTTP client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+    
+    async def startup(self) -> None:
+        """Open connection pools, warming them if HTTP_WARM_POOLS is set"""
+        client = self.client
+        if not (settings.HTTP_WARM_POOLS and self.base_url):
+            return
+        try:
+            if self.use_cloudscraper:
+                await self._scraper_send(self.base_url)
+            else:
+                await self._send(self.base_url, lambda: client.head(self.base_url))
+        except Exception as e:
+            print(f"Warmup error ({self.name}): {e}")
+    
+    async def shutdown(self) -> None:
+        """Close connection pools"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        with self._scraper_lock:
+            scrapers, self._all_scrapers = self._all_scrapers, []
+            self._scrapers = threading.local()
+        for scraper in scrapers:
+            scraper.close()
+    
+    @asynccontextmanager
+    async def _fetch_slot(self) -> AsyncIterator[None]:
+        """Per-source limit on concurrent upstream requests"""
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._fetch_semaphore:
+            self._fetches_in_flight += 1
+            try:
+                yield
+            finally:
+                self._fetches_in_flight -= 1
+    
+    def free_fetch_slots(self) -> int:
+        """How many more upstream requests could start right now"""
+        return max(0, self.max_concurrency - self._fetches_in_flight)
+    
+    def host_limiter(self, url: str, images: bool = False) -> HostLimiter:
+        """Rate limiter of the host serving url (its image budget with images)"""
+        return get_rate_limiter().host(urlsplit(url).hostname or "", images)
+    
+    async def _send(self, url: str, send: Callable[[], Awaitable[Any]],
+                    transport: str = "httpx", images: bool = False) -> Any:
+        """Send a request within its host's rate limit, retrying 429/503"""
+        limiter = self.host_limiter(url, images)
+        attempt = 0
+        while True:
+            wait = limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            start = time.perf_counter()
+            try:
+                response = await send()
+            except Exception as e:
+                metrics.record_fetch(self.source_id, transport, time.perf_counter() - start, error=e)
+                raise
+            metrics.record_fetch(
+                self.source_id, transport, time.perf_counter() - start,
+                response.status_code, _response_size(response),
+            )
+            delay = limiter.record(
+                response.status_code, response.headers.get("Retry-After"), attempt
+            )
+            if delay is None:
+                return response
+            if isinstance(response, httpx.Response):
+                # Release the connection of a streamed response
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    def _send_sync(self, url: str, send: Callable[[], Any]) -> Any:
+        """Blocking variant of _send"""
+        limiter = self.host_limiter(url)
+        attempt = 0
+        while True:
+            wait = limiter.reserve()
+            if wait:
+                time.sleep(wait)
+            start = time.perf_counter()
+            try:
+                response = send()
+            except Exception as e:
+                metrics.record_fetch(
+                    self.source_id, "cloudscraper", time.perf_counter() - start, error=e
+                )
+                raise
+            metrics.record_fetch(
+                self.source_id, "cloudscraper", time.perf_counter() - start,
+                response.status_code, _response_size(response),
+            )
+            delay = limiter.record(
+                response.status_code, response.headers.get("Retry-After"), attempt
+            )
+            if delay is None:
+                return response
+            time.sleep(delay)
+            attempt += 1
+    
+    def _scraper_get(self, url: str, headers: Optional[dict] = None):
+        return self.scraper.get(
+            url, headers={**self.headers, **(headers or {})},
+            timeout=settings.REQUEST_TIMEOUT,
+        )
+    
+    async def _scraper_send(self, url: str, headers: Optional[dict] = None):
+        """Rate-limited cloudscraper request on the scraper executor.
+        
+        Waits happen on the event loop, so throttled hosts never tie up
+        executor threads.
+        """
+        loop = asyncio.get_running_loop()
+        return await self._send(url, lambda: loop.run_in_executor(
+            get_scrape_executor(), self._scraper_get, url, headers
+        ), transport="cloudscraper")
+    
+    async def fetch_page(self, url: str) -> str:
+        """Fetch page content without blocking the event loop.
+        
+        Cloudflare fetches run on the shared scraper executor; at most
+        ``max_concurrency`` requests per source are in flight at once.
+        """
+        async with self._fetch_slot():
+            if not self.use_cloudscraper:
+                return await self.fetch(url)
+            response = await self._scraper_send(url)
+        response.raise_for_status()
+        return response.text
+    
+    async def fetch_conditional(self, url: str, etag: Optional[str] = None,
+                                last_modified: Optional[str] = None) -> ConditionalResponse:
+        """Fetch a page unless it is unchanged since the given validators"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
+        async with self._fetch_slot():
+            if not self.use_cloudscraper:
+                response = await self._send(url, lambda: self.client.get(url, headers=headers))
+            else:
+                response = await self._scraper_send(url, headers)
+        
+        if response.status_code == 304:
+            return ConditionalResponse(True, None, etag, last_modified)
+        response.raise_for_status()
+        return ConditionalResponse(
+            False,
+            response.text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
     
     async def fetch(self, url: str) -> str:
         """Fetch page content"""
-        async with httpx.AsyncClient(headers=self.headers, timeout=30) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        response = await self._send(url, lambda: self.client.get(url))
+        response.raise_for_status()
+        return response.text
+    
+    async def open_image(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """Start a streamed image request within the image host's budget,
+        retrying 429/503. The caller reads and closes the response."""
+        headers = {"Referer": f"{self.base_url}/", **(headers or {})}
+        return await self._send(url, lambda: self.client.send(
+            self.client.build_request("GET", url, headers=headers), stream=True
+        ), images=True)
     
     def fetch_sync(self, url: str) -> str:
         """Synchronous fetch using cloudscraper (for Cloudflare)"""
-        response = self.scraper.get(url, headers=self.headers)
+        response = self._send_sync(url, lambda: self._scraper_get(url))
         response.raise_for_status()
         return response.text
     
-    def parse_html(self, html: str) -> BeautifulSoup:
+    @property
+    def source_id(self) -> str:
+        return self.__class__.__name__.lower().replace("source", "")
+    
+    async def _run_scrape(self, method: str, fn: Callable, args: Tuple[Any, ...]) -> Any:
+        """Run a scrape method through the search catalog, request
+        coalescing and the response cache, then feed the catalog and the
+        prefetcher"""
+        catalog = get_catalog()
+        catalog_results: List[Any] = []
+        if catalog is not None and method == "search":
+            start = time.perf_counter()
+            settled, catalog_results = await catalog.answer(self.source_id, *args)
+            if settled:
+                metrics.SCRAPE_SECONDS.observe(
+                    (self.source_id, method, "catalog"), time.perf_counter() - start
+                )
+                return catalog_results
+        key = (self.source_id, method, args)
+        cache = get_response_cache()
+        # The value this call's own scrape produced. A stale-while-revalidate
+        # refresh started by this call also runs scrape(), but its value is
+        # not the one returned, so the call still counts as a hit.
+        produced: Any = _NOT_FETCHED
+        
+        async def scrape() -> Any:
+            nonlocal produced
+            result = await profiling.profiled(
+                self.source_id, method, args, lambda: fn(self, *args)
+            )
+            metrics.SCRAPE_ITEMS.inc((self.source_id, method), metrics.count_items(result))
+            if catalog is not None:
+                await catalog.record(method, result)
+            produced = result
+            return result
+        
+        start = time.perf_counter()
+        try:
+            if profiling.forced():
+                # Profile the real work, not a cache hit
+                result = await scrape()
+            elif cache is None:
+                result = await single_flight.do(key, scrape)
+            else:
+                result = await single_flight.do(key, lambda: cache.get_or_fetch(
+                    key, settings.CACHE_TTLS.get(method, 0), scrape
+                ))
+        except Exception:
+            metrics.SCRAPE_SECONDS.observe(
+                (self.source_id, method, "error"), time.perf_counter() - start
+            )
+            raise
+        fetched = result is produced
+        metrics.SCRAPE_SECONDS.observe(
+            (self.source_id, method, "miss" if fetched else "hit"), time.perf_counter() - start
+        )
+        
+        prefetcher = get_prefetcher()
+        if prefetcher is not None:
+            if method == "get_manga_details":
+                prefetcher.remember(self, args[0], result)
+            elif method == "get_chapter_pages":
+                prefetcher.on_chapter_opened(self, args[0])
+        if catalog_results:
+            # Partial catalog matches go after the site's own results
+            seen = {item.id for item in result}
+            result = result + [item for item in catalog_results if item.id not in seen]
+        # The cache and coalesced callers share one instance; hand out copies
+        return _copy_result(result)
+    
+    async def invalidate(self, method: str, *args, **kwargs) -> None:
+        """Drop the cached response for one scrape call"""
+        cache = get_response_cache()
+        if cache is None:
+            return
+        fn = getattr(type(self), method).__wrapped__
+        await cache.invalidate((self.source_id, method, _bind_args(fn, args, kwargs)))
+    
+    async def cache_result(self, method: str, value: Any, *args, **kwargs) -> None:
+        """Store a freshly built response for one scrape call"""
+        cache = get_response_cache()
+        if cache is None:
+            return
+        fn = getattr(type(self), method).__wrapped__
+        await cache.set(
+            (self.source_id, method, _bind_args(fn, args, kwargs)),
+            value,
+            settings.CACHE_TTLS.get(method, 0),
+        )
+    
+    def parse_html(self, html: str) -> "BeautifulSoup":
         """Parse HTML content"""
+        from bs4 import BeautifulSoup
         return BeautifulSoup(html, 'lxml')
     
+    async def extract(self, fn: Callable, html: str) -> Any:
+        """Run an extraction function with the configured parser backend
+        (in the parse pool when PARSE_OFFLOAD is set)"""
+        start = time.perf_counter()
+        try:
+            pool = get_parse_pool()
+            if pool is None:
+                return run_extractor(fn, html)
+            return await pool.run(fn, html)
+        finally:
+            metrics.PARSE_SECONDS.observe(
+                (self.source_id, fn.__name__), time.perf_counter() - start
+            )
+    
     @abstractmethod
     async def search(self, query: str, page: int = 1) -> List[SearchResult]:
         """Search for manga"""
@@ -65,10 +505,78 @@ class BaseMangaSource(ABC):
         """Get latest updated manga"""
         pass
     
+    # ============ Batched listings ============
+    async def iter_listing(self, method: str, pages: Iterable[int],
+                           concurrency: Optional[int] = None,
+                           ordered: bool = True) -> AsyncIterator[ListingPage]:
+        """Fetch several pages of get_popular or get_latest concurrently.
+        
+        At most ``concurrency`` pages are in flight. Pages are yielded in
+        page order, or as they complete with ``ordered=False``. Entries
+        already yielded from another page (listings shift while they are
+        being read) are dropped and counted in ``duplicates``.
+        """
+        if method not in LISTING_METHODS:
+            raise ValueError(f"Not a listing method: {method}")
+        semaphore = asyncio.Semaphore(concurrency or settings.LISTING_BATCH_CONCURRENCY)
+        
+        async def fetch(page: int) -> Tuple[int, list, Optional[Exception]]:
+            async with semaphore:
+                try:
+                    return page, await getattr(self, method)(page), None
+                except Exception as e:
+                    return page, [], e
+        
+        tasks = [asyncio.ensure_future(fetch(page)) for page in pages]
+        seen = set()
+        try:
+            for next_page in (tasks if ordered else asyncio.as_completed(tasks)):
+                page, items, error = await next_page
+                fresh = []
+                for item in items:
+                    if item.id not in seen:
+                        seen.add(item.id)
+                        fresh.append(item)
+                yield ListingPage(
+                    page=page,
+                    items=fresh,
+                    duplicates=len(items) - len(fresh),
+                    error=str(error) if error is not None else None,
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def get_listing(self, method: str, start: int = 1, pages: int = 1,
+                          concurrency: Optional[int] = None) -> List[Any]:
+        """Entries of `pages` listing pages from `start`, de-duplicated, in page order"""
+        results = []
+        async for listing in self.iter_listing(method, range(start, start + pages), concurrency):
+            results.extend(listing.items)
+        return results
+    
+    # ============ Series page hooks (incremental refresh) ============
+    def details_url(self, manga_id: str) -> str:
+        """URL of the series page parsed by details_extractor"""
+        raise NotImplementedError
+    
+    def build_details(self, manga_id: str, url: str, record: dict,
+                      chapters: ChapterList) -> MangaDetails:
+        """Build MangaDetails from an extracted record and its chapters"""
+        raise NotImplementedError
+    
+    def chapter_record_id(self, record: dict) -> str:
+        """Chapter ID of an extracted chapter record"""
+        raise NotImplementedError
+    
+    def chapter_row(self, record: dict) -> ChapterRow:
+        """Build a chapter row from an extracted chapter record"""
+        raise NotImplementedError
+    
     def get_source_info(self) -> dict:
         """Get source information"""
         return {
-            "id": self.__class__.__name__.lower().replace("source", ""),
+            "id": self.source_id,
             "name": self.name,
             "url": self.base_url,
             "icon": self.icon,
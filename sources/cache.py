@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+from config import settings
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+class MemoryTier:
+    """Bounded in-memory LRU tier"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskTier:
+    """Optional on-disk tier, one pickle file per key"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: Hashable) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.path, digest[:2], f"{digest}.pkl")
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        try:
+            with open(self._file(key), "rb") as f:
+                stored_key, entry = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+        return entry if stored_key == key else None
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            os.unlink(self._file(key))
+        except FileNotFoundError:
+            pass
+
+class ResponseCache:
+    """Two-tier cache for source responses with stale-while-revalidate.
+
+    Fresh entries are returned directly. Expired entries still inside the
+    stale window are returned immediately while a background task fetches
+    a replacement; anything older is fetched inline.
+    """
+
+    def __init__(self, max_entries: int, disk_path: Optional[str] = None,
+                 stale_ttl: float = 0):
+        self.memory = MemoryTier(max_entries)
+        self.disk = DiskTier(disk_path) if disk_path else None
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._revalidating: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + self.stale_ttl)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, entry)
+
+    async def invalidate(self, key: Hashable) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    async def get_or_fetch(self, key: Hashable, ttl: float,
+                           fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, fetching it when needed"""
+        if ttl <= 0:
+            return await fetch()
+
+        now = time.time()
+        entry = await self.get(key)
+        if entry is not None and entry.is_fresh(now):
+            self.hits += 1
+            return entry.value
+        if entry is not None and entry.is_usable(now):
+            self.stale_hits += 1
+            self._revalidate(key, ttl, fetch)
+            return entry.value
+
+        self.misses += 1
+        value = await fetch()
+        if _is_cacheable(value):
+            await self.set(key, value, ttl)
+        return value
+
+    def _revalidate(self, key: Hashable, ttl: float,
+                    fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        async def refresh():
+            try:
+                value = await fetch()
+                if _is_cacheable(value):
+                    await self.set(key, value, ttl)
+            except Exception as e:
+                print(f"Cache refresh error: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidating": len(self._revalidating),
+        }
+
+def _is_cacheable(value: Any) -> bool:
+    # Listing methods swallow upstream errors and return [], so an empty
+    # result is not worth pinning for a whole TTL.
+    return value is not None and value != []
+
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared response cache, or None when caching is disabled"""
+    global _response_cache
+    if not settings.CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            disk_path=settings.CACHE_DISK_PATH,
+            stale_ttl=settings.CACHE_STALE_TTL,
+        )
+    return _response_cache
@@ -0,0 +1,362 @@
+"""Local search catalog in SQLite FTS5.
+
+Series seen in listings, search results and details pages are stored on
+disk with their alternative titles, authors and genres, and indexed with
+the FTS5 trigram tokenizer. A query is matched on its trigrams, so typos
+and partial titles still find candidates; candidates are then ranked by
+trigram similarity to the best-matching title (or author).
+
+When CATALOG_ENABLED is set, ``search`` calls are answered from the
+catalog when the best match covers the whole query; otherwise they go to
+the site and the catalog matches are merged into its results. ``CatalogCrawler``
+fills the catalog from popular/latest listings and details pages.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+from config import settings
+from models.schemas import MangaDetails, PopularManga, SearchResult
+
+if TYPE_CHECKING:
+    from .base import BaseMangaSource
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    manga_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    cover TEXT,
+    latest_chapter TEXT,
+    alt_titles TEXT NOT NULL DEFAULT '[]',
+    authors TEXT NOT NULL DEFAULT '[]',
+    genres TEXT NOT NULL DEFAULT '[]',
+    listed_at REAL,
+    details_at REAL,
+    UNIQUE (source, manga_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS series_fts USING fts5(
+    names, people, genres, tokenize = 'trigram'
+);
+"""
+
+# Candidates fetched from FTS5 before similarity ranking
+CANDIDATES = 200
+
+def _normalize(text: str) -> str:
+    # federated imports base, which imports this module
+    from .federated import normalize_title
+    return normalize_title(text)
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def similarity(query: Set[str], text: str) -> float:
+    """How well text matches a query's trigrams (1.0 = every trigram found,
+    with a small preference for texts of similar length)"""
+    grams = _trigrams(text)
+    if not query or not grams:
+        return 0.0
+    common = len(query & grams)
+    return 0.8 * common / len(query) + 0.2 * 2 * common / (len(query) + len(grams))
+
+def _to_result(row: sqlite3.Row) -> SearchResult:
+    return SearchResult(
+        id=row["manga_id"], title=row["title"], cover=row["cover"], url=row["url"],
+        source=row["source"], latest_chapter=row["latest_chapter"],
+    )
+
+class CatalogIndex:
+    """On-disk series catalog with ranked fuzzy title search.
+
+    Methods are blocking (run them in a thread from async code); one
+    connection is shared behind a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ============ Writes ============
+    def _reindex(self, row_id: int) -> None:
+        row = self._db.execute(
+            "SELECT title, alt_titles, authors, genres FROM series WHERE id = ?", (row_id,)
+        ).fetchone()
+        names = [row["title"], *json.loads(row["alt_titles"])]
+        self._db.execute("DELETE FROM series_fts WHERE rowid = ?", (row_id,))
+        self._db.execute(
+            "INSERT INTO series_fts (rowid, names, people, genres) VALUES (?, ?, ?, ?)",
+            (
+                row_id,
+                "\n".join(_normalize(name) for name in names),
+                "\n".join(_normalize(name) for name in json.loads(row["authors"])),
+                "\n".join(_normalize(name) for name in json.loads(row["genres"])),
+            ),
+        )
+
+    def add_results(self, results: Iterable[SearchResult]) -> int:
+        """Store listing or search entries; returns how many were written"""
+        now = time.time()
+        count = 0
+        with self._lock, self._db:
+            for result in results:
+                row = self._db.execute(
+                    """
+                    INSERT INTO series (source, manga_id, title, url, cover, latest_chapter, listed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (source, manga_id) DO UPDATE SET
+                        title = excluded.title,
+                        url = excluded.url,
+                        cover = coalesce(excluded.cover, cover),
+                        latest_chapter = coalesce(excluded.latest_chapter, latest_chapter),
+                        listed_at = excluded.listed_at
+                    RETURNING id
+                    """,
+                    (result.source, result.id, result.title, result.url, result.cover,
+                     result.latest_chapter, now),
+                ).fetchone()
+                self._reindex(row["id"])
+                count += 1
+        return count
+
+    def add_details(self, details: MangaDetails) -> None:
+        """Store a series with its alternative titles, authors and genres"""
+        authors = [name for name in (details.author, details.artist) if name]
+        with self._lock, self._db:
+            row = self._db.execute(
+                """
+                INSERT INTO series (source, manga_id, title, url, cover,
+                                    alt_titles, authors, genres, details_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, manga_id) DO UPDATE SET
+                    title = excluded.title,
+                    url = excluded.url,
+                    cover = coalesce(excluded.cover, cover),
+                    alt_titles = excluded.alt_titles,
+                    authors = excluded.authors,
+                    genres = excluded.genres,
+                    details_at = excluded.details_at
+                RETURNING id
+                """,
+                (details.source, details.id, details.title, details.url, details.cover,
+                 json.dumps(details.alternative_titles), json.dumps(authors),
+                 json.dumps(details.genres + details.tags), time.time()),
+            ).fetchone()
+            self._reindex(row["id"])
+
+    # ============ Reads ============
+    def _ranked(self, query: str, source: Optional[str]) -> List[Tuple[float, bool, sqlite3.Row]]:
+        """Candidates scoring at least CATALOG_MIN_SCORE, best first, as
+        (score, covers the query, row)"""
+        text = _normalize(query)
+        if not text:
+            return []
+        grams = _trigrams(text)
+        if grams:
+            match = "{names people} : (" + " OR ".join(f'"{gram}"' for gram in grams) + ")"
+            where, params = "series_fts MATCH ?", [match]
+        else:
+            # Too short for trigrams; substring scan
+            where, params = "(names LIKE ? OR people LIKE ?)", [f"%{text}%"] * 2
+        if source is not None:
+            where += " AND s.source = ?"
+            params.append(source)
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT s.*, series_fts.names, series_fts.people FROM series_fts
+                JOIN series s ON s.id = series_fts.rowid
+                WHERE {where}
+                ORDER BY bm25(series_fts, 10.0, 3.0, 0.0)
+                LIMIT ?
+                """,
+                (*params, CANDIDATES),
+            ).fetchall()
+
+        scored = []
+        for rank, row in enumerate(rows):
+            names = row["names"].split("\n")
+            if grams:
+                score = max(
+                    max((similarity(grams, name) for name in names), default=0),
+                    0.8 * max((similarity(grams, name) for name in row["people"].split("\n")), default=0),
+                )
+                # Every query trigram appears in one title
+                covers = any(grams <= _trigrams(name) for name in names)
+            else:
+                score = 1.0 if text in row["names"] else 0.8
+                covers = False
+            if text in names:
+                score += 1.0
+                covers = True
+            if score >= settings.CATALOG_MIN_SCORE:
+                scored.append((-score, rank, covers, row))
+        scored.sort(key=lambda item: item[:2])
+        return [(-score, covers, row) for score, _, covers, row in scored]
+
+    def search(self, query: str, source: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[int, List[SearchResult]]:
+        """Ranked matches for query as (total matches, requested slice)"""
+        ranked = self._ranked(query, source)
+        return len(ranked), [_to_result(row) for _, _, row in ranked[offset:offset + limit]]
+
+    def covered_search(self, query: str, source: Optional[str] = None,
+                       limit: int = 20, offset: int = 0) -> Tuple[bool, List[SearchResult]]:
+        """Like ``search``, plus whether some match covers the whole
+        query (an exact title, or a title containing all of it)"""
+        ranked = self._ranked(query, source)
+        covered = any(covers for _, covers, _ in ranked)
+        return covered, [_to_result(row) for _, _, row in ranked[offset:offset + limit]]
+
+    def needs_details(self, source: str, limit: int, max_age: float) -> List[str]:
+        """Manga IDs whose details are missing or older than max_age seconds"""
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT manga_id FROM series
+                WHERE source = ? AND (details_at IS NULL OR details_at < ?)
+                ORDER BY details_at IS NOT NULL, details_at, listed_at DESC
+                LIMIT ?
+                """,
+                (source, time.time() - max_age, limit),
+            ).fetchall()
+        return [row["manga_id"] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source, count(*) AS series, count(details_at) AS with_details "
+                "FROM series GROUP BY source"
+            ).fetchall()
+        return {row["source"]: {"series": row["series"], "with_details": row["with_details"]}
+                for row in rows}
+
+    # ============ Scrape pipeline hooks ============
+    async def answer(self, source_id: str, query: str, page: int = 1) -> Tuple[bool, List[SearchResult]]:
+        """Catalog matches for a source's search call, and whether they
+        settle it. Only a match covering the whole query does; otherwise
+        the caller searches the site and merges these in."""
+        size = settings.CATALOG_PAGE_SIZE
+        return await asyncio.to_thread(
+            self.covered_search, query, source_id, size, (page - 1) * size
+        )
+
+    async def record(self, method: str, result: Any) -> None:
+        """Index a freshly scraped listing, search or details result"""
+        try:
+            if method == "get_manga_details":
+                await asyncio.to_thread(self.add_details, result)
+            elif method in ("search", "get_popular", "get_latest"):
+                await asyncio.to_thread(self.add_results, [
+                    SearchResult(**item.model_dump(include=set(SearchResult.model_fields)))
+                    if isinstance(item, PopularManga) else item
+                    for item in result
+                ])
+        except Exception as e:
+            print(f"Catalog index error: {e}")
+
+class CatalogCrawler:
+    """Fill the catalog from listings and details pages.
+
+    A crawl reads ``pages`` of get_popular and get_latest per source,
+    then fetches details for up to ``details`` series that have none (or
+    stale ones). Requests go through the normal scrape pipeline, so the
+    host rate limits apply, and fresh results are recorded into the
+    catalog there (BaseMangaSource._run_scrape).
+    """
+
+    def __init__(self, catalog: CatalogIndex,
+                 sources: Optional[Dict[str, "BaseMangaSource"]] = None,
+                 pages: Optional[int] = None,
+                 details: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self.catalog = catalog
+        self._sources = sources
+        self.pages = pages or settings.CATALOG_CRAWL_PAGES
+        self.details = settings.CATALOG_DETAILS_PER_CRAWL if details is None else details
+        self.interval = interval or settings.CATALOG_CRAWL_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_sources(self) -> Dict[str, "BaseMangaSource"]:
+        if self._sources is None:
+            from . import get_all_sources
+            return get_all_sources()
+        return self._sources
+
+    async def crawl(self) -> Dict[str, int]:
+        """Run one crawl over every source; returns entries indexed per source"""
+        sources = self._get_sources()
+        counts = await asyncio.gather(*(self._crawl_source(s) for s in sources.values()))
+        return dict(zip(sources.keys(), counts))
+
+    async def _crawl_source(self, source: "BaseMangaSource") -> int:
+        count = 0
+        for method in ("get_popular", "get_latest"):
+            pages = range(1, self.pages + 1)
+            async for listing in source.iter_listing(method, pages, ordered=False):
+                if listing.error:
+                    print(f"Catalog crawl error ({source.source_id} {method} "
+                          f"{listing.page}): {listing.error}")
+                    continue
+                count += len(listing.items)
+
+        manga_ids = await asyncio.to_thread(
+            self.catalog.needs_details, source.source_id, self.details,
+            settings.CATALOG_DETAILS_MAX_AGE,
+        )
+        for manga_id in manga_ids:
+            try:
+                await source.get_manga_details(manga_id)
+            except Exception as e:
+                print(f"Catalog crawl error ({source.source_id}/{manga_id}): {e}")
+                continue
+            count += 1
+        return count
+
+    # ============ Lifecycle ============
+    def start(self) -> None:
+        """Crawl now and then every ``interval`` seconds"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.crawl()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Catalog crawl error: {e}")
+            await asyncio.sleep(self.interval)
+
+_catalog: Optional[CatalogIndex] = None
+
+def get_catalog() -> Optional[CatalogIndex]:
+    """Get the shared catalog, or None when the catalog is disabled"""
+    global _catalog
+    if not settings.CATALOG_ENABLED:
+        return None
+    if _catalog is None:
+        _catalog = CatalogIndex(settings.CATALOG_PATH)
+    return _catalog
@@ -0,0 +1,122 @@
+import asyncio
+import re
+import time
+import unicodedata
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from config import settings
+from models.schemas import (
+    FederatedSearchResponse, MergedSearchResult, SearchResult, SourceSearchBatch
+)
+from .base import BaseMangaSource
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for cross-source matching.
+
+    Case, accents, punctuation and whitespace are ignored, so
+    "Omniscient Reader’s Viewpoint" and "omniscient readers viewpoint"
+    compare equal. Whitespace is dropped entirely because scraped titles
+    lose the spaces between inline elements ("SoloLeveling").
+    """
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"['’`]", "", text.casefold())
+    return "".join(re.sub(r"[\W_]+", " ", text).split())
+
+class SearchMerger:
+    """Merge per-source results, de-duplicated by normalized title"""
+
+    def __init__(self):
+        self._merged: Dict[str, MergedSearchResult] = {}
+
+    def add(self, results: Iterable[SearchResult]) -> None:
+        for result in results:
+            key = normalize_title(result.title) or result.title
+            merged = self._merged.get(key)
+            if merged is None:
+                self._merged[key] = MergedSearchResult(
+                    title=result.title,
+                    normalized_title=key,
+                    cover=result.cover,
+                    results=[result],
+                )
+                continue
+            if any(r.source == result.source and r.id == result.id for r in merged.results):
+                continue
+            merged.results.append(result)
+            if merged.cover is None:
+                merged.cover = result.cover
+
+    def results(self) -> List[MergedSearchResult]:
+        # Titles found on more sources first, otherwise first-seen order
+        return sorted(self._merged.values(), key=lambda m: -len(m.results))
+
+async def _search_one(source: BaseMangaSource, query: str, page: int) -> SourceSearchBatch:
+    start = time.perf_counter()
+    try:
+        results = await source.search(query, page)
+    except Exception as e:
+        return SourceSearchBatch(
+            source=source.source_id, status="error", error=str(e),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+    return SourceSearchBatch(
+        source=source.source_id, status="ok", results=results,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+    )
+
+async def federated_search_stream(
+    query: str,
+    page: int = 1,
+    sources: Optional[Dict[str, BaseMangaSource]] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[SourceSearchBatch]:
+    """Search every source concurrently, yielding each source's batch as
+    soon as it answers.
+
+    Sources that miss the deadline are yielded last with status "timeout".
+    Their searches are abandoned, not awaited, but any upstream fetch
+    already in flight still finishes and lands in the response cache.
+    """
+    if sources is None:
+        from . import get_all_sources
+        sources = get_all_sources()
+    timeout = settings.FEDERATED_SEARCH_TIMEOUT if timeout is None else timeout
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    tasks = {
+        asyncio.create_task(_search_one(source, query, page)): source_id
+        for source_id, source in sources.items()
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+        for task in pending:
+            yield SourceSearchBatch(
+                source=tasks[task], status="timeout", elapsed_ms=timeout * 1000
+            )
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def federated_search(
+    query: str,
+    page: int = 1,
+    sources: Optional[Dict[str, BaseMangaSource]] = None,
+    timeout: Optional[float] = None,
+) -> FederatedSearchResponse:
+    """Search every source concurrently and merge the results"""
+    merger = SearchMerger()
+    statuses = []
+    async for batch in federated_search_stream(query, page, sources, timeout):
+        merger.add(batch.results)
+        statuses.append(batch.model_copy(update={"results": []}))
+    return FederatedSearchResponse(query=query, results=merger.results(), sources=statuses)
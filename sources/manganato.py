@@ -2,12 +2,110 @@ import re
 from typing import List
 from urllib.parse import quote
 from .base import BaseMangaSource
+from .parsing import extractor
 from models.schemas import (
-    SearchResult, MangaDetails, Chapter, ChapterPages,
+    SearchResult, MangaDetails, ChapterPages,
     PopularManga, MangaStatus
 )
+from models.chapters import ChapterList, ChapterRow
+
+# ============ Extractors ============
+@extractor(".search-story-item")
+def extract_search(p, root) -> List[dict]:
+    records = []
+    for item in p.select(root, ".search-story-item"):
+        link = p.select_one(item, "a.item-img")
+        title = p.select_one(item, "a.item-title")
+        img = p.select_one(item, "img")
+        chapter = p.select_one(item, ".item-chapter a")
+        
+        if link is not None and title is not None:
+            records.append({
+                "url": p.attr(link, "href") or "",
+                "title": p.text(title),
+                "cover": p.attr(img, "src") if img is not None else None,
+                "latest_chapter": p.text(chapter) if chapter is not None else None,
+            })
+    return records
+
+@extractor(".content-genres-item")
+def extract_genre_listing(p, root) -> List[dict]:
+    records = []
+    for item in p.select(root, ".content-genres-item"):
+        link = p.select_one(item, "a.genres-item-img")
+        title = p.select_one(item, "a.genres-item-name")
+        img = p.select_one(item, "img")
+        chapter = p.select_one(item, ".genres-item-chap")
+        
+        if link is not None and title is not None:
+            records.append({
+                "url": p.attr(link, "href") or "",
+                "title": p.text(title),
+                "cover": p.attr(img, "src") if img is not None else None,
+                "latest_chapter": p.text(chapter) if chapter is not None else None,
+            })
+    return records
+
+@extractor("h1", ".info-image", "#panel-story-info-description",
+           ".variations-tableInfo", ".row-content-chapter")
+def extract_details(p, root) -> dict:
+    title = p.select_one(root, "h1")
+    cover = p.select_one(root, ".info-image img")
+    desc = p.select_one(root, "#panel-story-info-description")
+    
+    author = status = None
+    genres = []
+    for row in p.select(root, ".variations-tableInfo tr"):
+        label = p.select_one(row, ".table-label")
+        value = p.select_one(row, ".table-value")
+        if label is not None and value is not None:
+            label_text = p.text(label).lower()
+            if "author" in label_text:
+                author = p.text(value)
+            elif "status" in label_text:
+                status = p.text(value)
+            elif "genres" in label_text:
+                genres = [p.text(a) for a in p.select(value, "a")]
+    
+    chapters = []
+    for ch in p.select(root, ".row-content-chapter li"):
+        ch_link = p.select_one(ch, "a")
+        ch_date = p.select_one(ch, ".chapter-time")
+        
+        if ch_link is not None:
+            chapters.append({
+                "url": p.attr(ch_link, "href") or "",
+                "title": p.text(ch_link),
+                "release_date": p.attr(ch_date, "title") if ch_date is not None else None,
+            })
+    
+    return {
+        "title": p.text(title) if title is not None else None,
+        "cover": p.attr(cover, "src") if cover is not None else None,
+        "description": p.text(desc) if desc is not None else None,
+        "author": author,
+        "status": status,
+        "genres": genres,
+        "chapters": chapters,
+    }
+
+@extractor(".container-chapter-reader", ".panel-chapter-info-top")
+def extract_chapter_pages(p, root) -> dict:
+    pages = []
+    for img in p.select(root, ".container-chapter-reader img"):
+        src = p.attr(img, "src")
+        if src:
+            pages.append(src)
+    
+    title = p.select_one(root, ".panel-chapter-info-top h1")
+    return {
+        "title": p.text(title) if title is not None else None,
+        "pages": pages,
+    }
 
 class ManganatoSource(BaseMangaSource):
+    details_extractor = staticmethod(extract_details)
+    
     def __init__(self):
         super().__init__()
         self.name = "Manganato"
@@ -21,32 +119,8 @@ class ManganatoSource(BaseMangaSource):
         try:
             search_query = query.replace(" ", "_")
             url = f"{self.base_url}/search/story/{quote(search_query)}?page={page}"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            results = []
-            items = soup.select(".search-story-item")
-            
-            for item in items:
-                link = item.select_one("a.item-img")
-                title = item.select_one("a.item-title")
-                img = item.select_one("img")
-                chapter = item.select_one(".item-chapter a")
-                
-                if link and title:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(SearchResult(
-                        id=manga_id,
-                        title=title.get_text(strip=True),
-                        cover=img.get("src") if img else None,
-                        url=manga_url,
-                        source="manganato",
-                        latest_chapter=chapter.get_text(strip=True) if chapter else None
-                    ))
-            
-            return results
+            html = await self.fetch_page(url)
+            return self._to_search_results(await self.extract(extract_search, html))
         except Exception as e:
             print(f"Search error: {e}")
             return []
@@ -54,68 +128,11 @@ class ManganatoSource(BaseMangaSource):
     async def get_manga_details(self, manga_id: str) -> MangaDetails:
         """Get manga details"""
         try:
-            url = f"{self.chapbase_url}/manga-{manga_id}"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            # Title and cover
-            title = soup.select_one("h1")
-            cover = soup.select_one(".info-image img")
-            desc = soup.select_one("#panel-story-info-description")
-            
-            # Metadata
-            author = artist = status = None
-            genres = []
-            
-            info_table = soup.select(".variations-tableInfo tr")
-            for row in info_table:
-                label = row.select_one(".table-label")
-                value = row.select_one(".table-value")
-                if label and value:
-                    label_text = label.get_text(strip=True).lower()
-                    if "author" in label_text:
-                        author = value.get_text(strip=True)
-                    elif "status" in label_text:
-                        status = self._parse_status(value.get_text(strip=True))
-                    elif "genres" in label_text:
-                        genres = [a.get_text(strip=True) for a in value.select("a")]
-            
-            # Chapters
-            chapters = []
-            chapter_list = soup.select(".row-content-chapter li")
-            
-            for ch in chapter_list:
-                ch_link = ch.select_one("a")
-                ch_date = ch.select_one(".chapter-time")
-                
-                if ch_link:
-                    ch_url = ch_link.get("href", "")
-                    ch_id = self._extract_chapter_id(ch_url)
-                    ch_title = ch_link.get_text(strip=True)
-                    ch_number = self._extract_chapter_number(ch_title)
-                    
-                    chapters.append(Chapter(
-                        id=ch_id,
-                        number=ch_number,
-                        title=ch_title,
-                        url=ch_url,
-                        release_date=ch_date.get("title") if ch_date else None
-                    ))
-            
-            return MangaDetails(
-                id=manga_id,
-                title=title.get_text(strip=True) if title else manga_id,
-                cover=cover.get("src") if cover else None,
-                description=desc.get_text(strip=True) if desc else None,
-                author=author,
-                artist=artist,
-                status=status,
-                genres=genres,
-                source="manganato",
-                url=url,
-                chapters=chapters,
-                total_chapters=len(chapters)
-            )
+            url = self.details_url(manga_id)
+            html = await self.fetch_page(url)
+            record = await self.extract(self.details_extractor, html)
+            chapters = ChapterList(self.chapter_row(ch) for ch in record["chapters"])
+            return self.build_details(manga_id, url, record, chapters)
         except Exception as e:
             print(f"Details error: {e}")
             raise
@@ -124,28 +141,20 @@ class ManganatoSource(BaseMangaSource):
         """Get chapter pages"""
         try:
             url = chapter_id if chapter_id.startswith("http") else f"{self.chapbase_url}/{chapter_id}"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            pages = []
-            images = soup.select(".container-chapter-reader img")
-            
-            for img in images:
-                src = img.get("src")
-                if src:
-                    pages.append(src)
+            html = await self.fetch_page(url)
+            record = await self.extract(extract_chapter_pages, html)
             
-            title = soup.select_one(".panel-chapter-info-top h1")
+            title = record["title"]
             ch_number = self._extract_chapter_number(
-                title.get_text(strip=True) if title else chapter_id
+                title if title is not None else chapter_id
             )
             
             return ChapterPages(
                 chapter_id=chapter_id,
                 chapter_number=ch_number,
-                title=title.get_text(strip=True) if title else None,
-                pages=pages,
-                total_pages=len(pages)
+                title=title,
+                pages=record["pages"],
+                total_pages=len(record["pages"])
             )
         except Exception as e:
             print(f"Chapter pages error: {e}")
@@ -155,28 +164,17 @@ class ManganatoSource(BaseMangaSource):
         """Get popular manga"""
         try:
             url = f"{self.base_url}/genre-all/{page}?type=topview"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
+            html = await self.fetch_page(url)
             
             results = []
-            items = soup.select(".content-genres-item")
-            
-            for item in items:
-                link = item.select_one("a.genres-item-img")
-                title = item.select_one("a.genres-item-name")
-                img = item.select_one("img")
-                
-                if link and title:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(PopularManga(
-                        id=manga_id,
-                        title=title.get_text(strip=True),
-                        cover=img.get("src") if img else "",
-                        url=manga_url,
-                        source="manganato"
-                    ))
+            for item in await self.extract(extract_genre_listing, html):
+                results.append(PopularManga(
+                    id=self._extract_id(item["url"]),
+                    title=item["title"],
+                    cover=item["cover"] or "",
+                    url=item["url"],
+                    source="manganato"
+                ))
             
             return results
         except Exception as e:
@@ -187,37 +185,58 @@ class ManganatoSource(BaseMangaSource):
         """Get latest manga"""
         try:
             url = f"{self.base_url}/genre-all/{page}"
-            html = self.fetch_sync(url)
-            soup = self.parse_html(html)
-            
-            results = []
-            items = soup.select(".content-genres-item")
-            
-            for item in items:
-                link = item.select_one("a.genres-item-img")
-                title = item.select_one("a.genres-item-name")
-                img = item.select_one("img")
-                chapter = item.select_one(".genres-item-chap")
-                
-                if link and title:
-                    manga_url = link.get("href", "")
-                    manga_id = self._extract_id(manga_url)
-                    
-                    results.append(SearchResult(
-                        id=manga_id,
-                        title=title.get_text(strip=True),
-                        cover=img.get("src") if img else None,
-                        url=manga_url,
-                        source="manganato",
-                        latest_chapter=chapter.get_text(strip=True) if chapter else None
-                    ))
-            
-            return results
+            html = await self.fetch_page(url)
+            return self._to_search_results(await self.extract(extract_genre_listing, html))
         except Exception as e:
             print(f"Latest error: {e}")
             return []
     
     # ============ Helpers ============
+    def _to_search_results(self, records: List[dict]) -> List[SearchResult]:
+        return [
+            SearchResult(
+                id=self._extract_id(item["url"]),
+                title=item["title"],
+                cover=item["cover"],
+                url=item["url"],
+                source="manganato",
+                latest_chapter=item["latest_chapter"]
+            )
+            for item in records
+        ]
+    
+    def details_url(self, manga_id: str) -> str:
+        return f"{self.chapbase_url}/manga-{manga_id}"
+    
+    def build_details(self, manga_id: str, url: str, record: dict,
+                      chapters: ChapterList) -> MangaDetails:
+        return MangaDetails(
+            id=manga_id,
+            title=record["title"] if record["title"] is not None else manga_id,
+            cover=record["cover"],
+            description=record["description"],
+            author=record["author"],
+            artist=None,
+            status=self._parse_status(record["status"]) if record["status"] is not None else None,
+            genres=record["genres"],
+            source="manganato",
+            url=url,
+            chapters=chapters,
+            total_chapters=len(chapters)
+        )
+    
+    def chapter_record_id(self, record: dict) -> str:
+        return self._extract_chapter_id(record["url"])
+    
+    def chapter_row(self, record: dict) -> ChapterRow:
+        return ChapterRow(
+            id=self.chapter_record_id(record),
+            number=self._extract_chapter_number(record["title"]),
+            title=record["title"],
+            url=record["url"],
+            release_date=record["release_date"]
+        )
+    
     def _extract_id(self, url: str) -> str:
         match = re.search(r'manga-(\w+)', url)
         return match.group(1) if match else url
@@ -0,0 +1,225 @@
+"""In-process metrics exported in the Prometheus text format.
+
+Metrics are plain counters and histograms keyed by label tuples; they are
+cheap enough to record on every fetch, parse and scrape call, and safe
+to record from the scraper threads. ``collectors`` add point-in-time
+values (cache sizes, limiter state) when the exposition is rendered.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Labels = Tuple[str, ...]
+
+# Seconds; covers cache hits through slow Cloudflare challenges
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), value: float = 1) -> None:
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        for labels, value in sorted(self.values.items()):
+            yield self.name, labels, "", value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, labels: Labels, value: float) -> None:
+        with self._lock:
+            self.values[labels] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Labels = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self.counts: Dict[Labels, List[int]] = {}
+        self.sums: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self.counts.get(labels)
+            if counts is None:
+                counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+                self.sums[labels] = 0.0
+            counts[index] += 1
+            self.sums[labels] += value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, str, float]]:
+        for labels, counts in sorted(self.counts.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                yield self.name + "_bucket", labels, f'le="{_format_value(bound)}"', total
+            yield self.name + "_sum", labels, "", self.sums[labels]
+            yield self.name + "_count", labels, "", total
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Labels = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Labels = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Labels = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Run collect() (which updates gauges) before every render"""
+        self.collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            with metric._lock:
+                samples = list(metric.samples())
+            for name, labels, extra, value in samples:
+                lines.append(
+                    f"{name}{_format_labels(metric.labels, labels, extra)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ============ Source metrics ============
+FETCH_SECONDS = registry.histogram(
+    "scraper_fetch_seconds", "Upstream request latency (cloudscraper includes challenges)",
+    ("source", "transport"),
+)
+FETCH_REQUESTS = registry.counter(
+    "scraper_fetch_requests_total", "Upstream responses by status",
+    ("source", "transport", "status"),
+)
+FETCH_BYTES = registry.counter(
+    "scraper_fetch_bytes_total", "Response bytes received", ("source", "transport"),
+)
+FETCH_ERRORS = registry.counter(
+    "scraper_fetch_errors_total", "Upstream requests that raised", ("source", "transport", "error"),
+)
+PARSE_SECONDS = registry.histogram(
+    "scraper_parse_seconds", "HTML extraction time", ("source", "extractor"),
+)
+SCRAPE_SECONDS = registry.histogram(
+    "scraper_scrape_seconds", "Scrape method latency as seen by callers",
+    ("source", "method", "result"),
+)
+SCRAPE_ITEMS = registry.counter(
+    "scraper_items_parsed_total", "Results, chapters or pages returned by fresh scrapes",
+    ("source", "method"),
+)
+CACHE_HIT_RATIO = registry.gauge(
+    "scraper_cache_hit_ratio",
+    "Share of scrape calls answered without an upstream fetch (cache, catalog or coalesced)",
+    ("source", "method"),
+)
+
+def record_fetch(source: str, transport: str, seconds: float,
+                 status: Optional[int] = None, size: int = 0,
+                 error: Optional[BaseException] = None) -> None:
+    labels = (source, transport)
+    FETCH_SECONDS.observe(labels, seconds)
+    if error is not None:
+        FETCH_ERRORS.inc((source, transport, type(error).__name__))
+        return
+    FETCH_REQUESTS.inc((source, transport, str(status)))
+    if size:
+        FETCH_BYTES.inc(labels, size)
+
+def count_items(result: object) -> int:
+    """Number of items in a scrape result"""
+    for attr in ("chapters", "pages"):
+        value = getattr(result, attr, None)
+        if value is not None:
+            return len(value)
+    return len(result) if isinstance(result, list) else 0
+
+def _collect_hit_ratios() -> None:
+    totals: Dict[Labels, Dict[str, float]] = {}
+    for (source, method, result), count in list(SCRAPE_SECONDS.counts.items()):
+        totals.setdefault((source, method), {}).setdefault(result, 0)
+        totals[(source, method)][result] += sum(count)
+    for labels, results in totals.items():
+        calls = sum(results.values())
+        if calls:
+            answered = results.get("hit", 0) + results.get("catalog", 0)
+            CACHE_HIT_RATIO.set(labels, answered / calls)
+
+registry.add_collector(_collect_hit_ratios)
+
+# ============ Shared component state ============
+COMPONENT_STATE = registry.gauge(
+    "scraper_component_state", "Point-in-time counters of the cache, coalescer and limiters",
+    ("component", "key", "stat"),
+)
+
+def _collect_components() -> None:
+    from .cache import get_response_cache
+    from .parsepool import get_parse_pool
+    from .ratelimit import get_rate_limiter
+    from .singleflight import single_flight
+
+    cache = get_response_cache()
+    if cache is not None:
+        for stat, value in cache.stats().items():
+            COMPONENT_STATE.set(("response_cache", "", stat), value)
+    for stat, value in single_flight.stats().items():
+        COMPONENT_STATE.set(("single_flight", "", stat), value)
+    pool = get_parse_pool()
+    if pool is not None:
+        for stat, value in pool.stats().items():
+            COMPONENT_STATE.set(("parse_pool", "", stat), value)
+    limits = get_rate_limiter().snapshot()
+    for component, hosts in (("host_limiter", limits["hosts"]),
+                             ("image_host_limiter", limits["image_hosts"])):
+        for host, state in hosts.items():
+            for stat in ("rate", "tokens", "blocked_for", "throttled", "retries"):
+                COMPONENT_STATE.set((component, host, stat), state[stat])
+
+registry.add_collector(_collect_components)
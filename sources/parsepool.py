@@ -0,0 +1,111 @@
+"""Run HTML extraction in worker processes.
+
+Extraction functions are module-level and return plain dicts and lists,
+so a page can be parsed in another process and only the small record
+sent back; the calling source still builds its ``models.schemas``
+objects from it. Each worker imports the source modules and creates
+its parser backend once, when it starts.
+
+Pages smaller than PARSE_OFFLOAD_MIN_BYTES are parsed inline: for them
+the round trip costs more than the parse.
+"""
+import asyncio
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Sequence
+from config import settings
+from .parsing import get_parser_backend, run_extractor
+
+def _init_worker(backend: str, modules: Sequence[str]) -> None:
+    settings.PARSER_BACKEND = backend
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"Parse worker import error ({module}): {e}")
+    get_parser_backend().parse("<html><body></body></html>")
+
+def _ping() -> int:
+    return os.getpid()
+
+class ParsePool:
+    """Process pool for run_extractor calls"""
+
+    def __init__(self, workers: Optional[int] = None,
+                 min_bytes: Optional[int] = None,
+                 modules: Sequence[str] = ()):
+        self.workers = workers or settings.PARSE_WORKERS or os.cpu_count() or 1
+        self.min_bytes = settings.PARSE_OFFLOAD_MIN_BYTES if min_bytes is None else min_bytes
+        self.modules = tuple(modules)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.counters = {"offloaded": 0, "inline": 0, "broken": 0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(settings.PARSE_START_METHOD),
+                initializer=_init_worker,
+                initargs=(settings.PARSER_BACKEND, self.modules),
+            )
+        return self._pool
+
+    async def run(self, fn: Callable, html: str) -> Any:
+        """run_extractor(fn, html), in a worker process for large pages"""
+        if len(html) < self.min_bytes:
+            self.counters["inline"] += 1
+            return run_extractor(fn, html)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor(), run_extractor, fn, html)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            print(f"Parse pool error: {e}")
+            self.counters["broken"] += 1
+            self.shutdown()
+            return run_extractor(fn, html)
+        self.counters["offloaded"] += 1
+        return result
+
+    async def warm(self) -> None:
+        """Start the worker processes ahead of the first parse"""
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        try:
+            await asyncio.gather(
+                *(loop.run_in_executor(pool, _ping) for _ in range(self.workers))
+            )
+        except BrokenProcessPool as e:
+            print(f"Parse pool error: {e}")
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {**self.counters, "workers": self.workers}
+
+_parse_pool: Optional[ParsePool] = None
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """Get the shared parse pool, or None when parsing runs inline"""
+    global _parse_pool
+    if not settings.PARSE_OFFLOAD:
+        return None
+    if _parse_pool is None:
+        from . import SOURCE_CLASSES
+        modules = [path.split(":")[0] for path in SOURCE_CLASSES.values()]
+        _parse_pool = ParsePool(modules=modules)
+    return _parse_pool
+
+def shutdown_parse_pool() -> None:
+    """Stop the parse worker processes"""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+        _parse_pool = None
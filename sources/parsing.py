@@ -0,0 +1,207 @@
+"""Pluggable HTML extraction backends.
+
+Sources describe *what* to read with small extraction functions that only
+use the backend-neutral ``select``/``select_one``/``text``/``attr`` calls,
+and declare the page regions they need with ``@extractor``. The lxml
+backend builds the tree in C and runs precompiled XPath translated from
+the CSS selectors; the BeautifulSoup backend is kept as a fallback and
+only builds the declared regions (via SoupStrainer).
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from config import settings
+
+def extractor(*regions: str) -> Callable:
+    """Declare the page regions an extraction function reads.
+
+    Regions are simple selectors (``tag``, ``#id``, ``.class`` or a
+    combination). Every selector the function uses from the document root
+    must resolve inside one of them.
+    """
+    def decorate(fn: Callable) -> Callable:
+        fn.regions = regions
+        return fn
+    return decorate
+
+# ============ CSS -> XPath ============
+_SIMPLE_RE = re.compile(
+    r"(?P<tag>\*|[a-zA-Z][\w-]*)?(?P<rest>(?:[.#][\w-]+|\[[^\]]+\])*)$"
+)
+_PART_RE = re.compile(
+    r"\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)"
+    r"|\[\s*(?P<attr>[\w-]+)\s*(?:=\s*(?P<q>['\"]?)(?P<val>.*?)(?P=q))?\s*\]"
+)
+
+def _parse_simple(selector: str) -> Dict[str, Any]:
+    match = _SIMPLE_RE.match(selector)
+    if not match or not selector:
+        raise ValueError(f"Unsupported selector: {selector!r}")
+    parts: Dict[str, Any] = {
+        "tag": (match.group("tag") or "*").lower(),
+        "classes": [], "id": None, "attrs": [],
+    }
+    for part in _PART_RE.finditer(match.group("rest")):
+        if part.group("cls"):
+            parts["classes"].append(part.group("cls"))
+        elif part.group("id"):
+            parts["id"] = part.group("id")
+        else:
+            parts["attrs"].append((part.group("attr"), part.group("val")))
+    return parts
+
+def css_to_xpath(selector: str) -> str:
+    """Translate the descendant-combinator CSS subset we use into XPath"""
+    steps = []
+    for simple in selector.split():
+        parts = _parse_simple(simple)
+        predicates = [
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+            for cls in parts["classes"]
+        ]
+        if parts["id"]:
+            predicates.append(f"@id='{parts['id']}'")
+        for name, value in parts["attrs"]:
+            predicates.append(f"@{name}" if value is None else f"@{name}='{value}'")
+        steps.append(
+            f"descendant::{parts['tag']}" + "".join(f"[{p}]" for p in predicates)
+        )
+    if not steps:
+        raise ValueError(f"Unsupported selector: {selector!r}")
+    return "/".join(steps)
+
+# ============ Backends ============
+class ParserBackend(ABC):
+    """Backend-neutral access to a parsed document"""
+
+    name: str = ""
+
+    @abstractmethod
+    def parse(self, html: str, regions: Sequence[str] = ()) -> Any:
+        """Parse html, keeping at least the given regions"""
+
+    @abstractmethod
+    def select(self, node: Any, selector: str) -> List[Any]:
+        """All descendants of node matching selector, in document order"""
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    @abstractmethod
+    def text(self, node: Any) -> str:
+        """Stripped text of node, like BeautifulSoup's get_text(strip=True)"""
+
+    @abstractmethod
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        """Attribute value of node, or None"""
+
+class LxmlBackend(ParserBackend):
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+        self._parser = etree.HTMLParser()
+
+    def parse(self, html: str, regions: Sequence[str] = ()) -> Any:
+        # The tree is built in C, so the cost of unused regions is small;
+        # selection below never walks nodes from Python.
+        try:
+            root = self._etree.fromstring(html, self._parser)
+        except ValueError:
+            root = self._etree.fromstring(html.encode("utf-8"), self._parser)
+        if root is None:
+            root = self._etree.fromstring("<html></html>", self._parser)
+        return root
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile(selector: str) -> Any:
+        from lxml import etree
+        return etree.XPath(css_to_xpath(selector))
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self._compile(selector)(node)
+
+    def text(self, node: Any) -> str:
+        return "".join(chunk.strip() for chunk in node.itertext())
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+class SoupBackend(ParserBackend):
+    name = "bs4"
+
+    def parse(self, html: str, regions: Sequence[str] = ()) -> Any:
+        from bs4 import BeautifulSoup, SoupStrainer
+        if not regions:
+            return BeautifulSoup(html, "lxml")
+        matchers = [_parse_simple(region) for region in regions]
+
+        def in_region(name, attrs) -> bool:
+            return any(_matches(m, name, attrs or {}) for m in matchers)
+
+        return BeautifulSoup(html, "lxml", parse_only=SoupStrainer(in_region))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile(selector: str) -> Any:
+        import soupsieve
+        return soupsieve.compile(selector)
+
+    def select(self, node: Any, selector: str) -> List[Any]:
+        return self._compile(selector).select(node)
+
+    def select_one(self, node: Any, selector: str) -> Optional[Any]:
+        return self._compile(selector).select_one(node)
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+def _matches(simple: Dict[str, Any], name: str, attrs: Dict[str, Any]) -> bool:
+    """Match a parsed simple selector against a start tag (for SoupStrainer)"""
+    if simple["tag"] != "*" and name != simple["tag"]:
+        return False
+    if simple["id"] and attrs.get("id") != simple["id"]:
+        return False
+    if simple["classes"]:
+        classes = attrs.get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        if not all(cls in classes for cls in simple["classes"]):
+            return False
+    for attr_name, value in simple["attrs"]:
+        if attr_name not in attrs or (value is not None and attrs[attr_name] != value):
+            return False
+    return True
+
+_BACKENDS = {
+    LxmlBackend.name: LxmlBackend,
+    SoupBackend.name: SoupBackend,
+}
+_instances: Dict[str, ParserBackend] = {}
+
+def get_parser_backend(name: Optional[str] = None) -> ParserBackend:
+    """Get a parser backend by name (defaults to settings.PARSER_BACKEND).
+
+    Falls back to BeautifulSoup when the requested backend is unavailable.
+    """
+    name = name or settings.PARSER_BACKEND
+    if name not in _instances:
+        try:
+            _instances[name] = _BACKENDS[name]()
+        except (KeyError, ImportError) as e:
+            print(f"Parser backend {name!r} unavailable ({e}), using bs4")
+            _instances[name] = get_parser_backend(SoupBackend.name)
+    return _instances[name]
+
+def run_extractor(fn: Callable, html: str, backend: Optional[ParserBackend] = None) -> Any:
+    """Parse html and run an extraction function against it"""
+    backend = backend or get_parser_backend()
+    root = backend.parse(html, getattr(fn, "regions", ()))
+    return fn(backend, root)
@@ -0,0 +1,160 @@
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from config import settings
+from models.chapters import ChapterList
+from models.schemas import MangaDetails
+
+if TYPE_CHECKING:
+    from downloader.store import ImageStore
+    from .base import BaseMangaSource
+
+# Set inside prefetch tasks so their own scrapes don't trigger more prefetching
+prefetching: ContextVar[bool] = ContextVar("prefetching", default=False)
+
+class ChapterPrefetcher:
+    """Warm the next chapter while the current one is being read.
+
+    Chapter order comes from get_manga_details results seen earlier (the
+    ``series`` map, LRU-bounded). When a reader opens a chapter, the next
+    chapter by number gets its page list resolved into the response cache
+    and its first ``images`` pages downloaded into the image store.
+    Re-opening a chapter re-checks its successor, which is cheap once
+    that is warm (a response cache hit plus image store lookups).
+
+    Prefetch is strictly background work: it starts after ``delay`` so
+    the current chapter's images go first, at most ``max_inflight`` run at
+    once, and each upstream request is skipped unless the source has
+    ``min_free_slots`` idle fetch slots and a spare rate-limit token.
+    Image fetches are checked against the image host budget instead, and
+    skipped while the source already has ``max_image_downloads`` image
+    downloads running.
+    """
+
+    def __init__(self, images: Optional[int] = None,
+                 delay: Optional[float] = None,
+                 max_inflight: Optional[int] = None,
+                 min_free_slots: Optional[int] = None,
+                 max_image_downloads: Optional[int] = None,
+                 max_series: Optional[int] = None):
+        self.images = settings.PREFETCH_IMAGES if images is None else images
+        self.delay = settings.PREFETCH_DELAY if delay is None else delay
+        self.max_inflight = max_inflight or settings.PREFETCH_MAX_INFLIGHT
+        self.min_free_slots = (
+            settings.PREFETCH_MIN_FREE_SLOTS if min_free_slots is None else min_free_slots
+        )
+        self.max_image_downloads = (
+            settings.PREFETCH_MAX_IMAGE_DOWNLOADS if max_image_downloads is None
+            else max_image_downloads
+        )
+        self.max_series = max_series or settings.PREFETCH_MAX_SERIES
+        # (source ID, manga ID) -> chapter list, and chapter -> series
+        self._series: "OrderedDict[Tuple[str, str], ChapterList]" = OrderedDict()
+        self._chapters: Dict[Tuple[str, str], str] = {}
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.counters = {"scheduled": 0, "pages": 0, "images": 0, "skipped": 0, "errors": 0}
+
+    # ============ Chapter order ============
+    def remember(self, source: "BaseMangaSource", manga_id: str, details: MangaDetails) -> None:
+        """Record a series' chapter order (cheap when it is unchanged)"""
+        key = (source.source_id, manga_id)
+        chapters = details.chapters
+        if self._series.get(key) is chapters:
+            self._series.move_to_end(key)
+            return
+        self._forget(key)
+        self._series[key] = chapters
+        for chapter_id in chapters.ids:
+            self._chapters[(source.source_id, chapter_id)] = manga_id
+        while len(self._series) > self.max_series:
+            self._forget(next(iter(self._series)))
+
+    def _forget(self, key: Tuple[str, str]) -> None:
+        chapters = self._series.pop(key, None)
+        if chapters is None:
+            return
+        source_id, manga_id = key
+        for chapter_id in chapters.ids:
+            if self._chapters.get((source_id, chapter_id)) == manga_id:
+                del self._chapters[(source_id, chapter_id)]
+
+    def next_chapter(self, source_id: str, chapter_id: str) -> Optional[str]:
+        """ID of the chapter after chapter_id, by number"""
+        manga_id = self._chapters.get((source_id, chapter_id))
+        if manga_id is None:
+            return None
+        chapters = self._series[(source_id, manga_id)]
+        position = chapters.ids.index(chapter_id)
+        following = chapters.number_index().next(chapters.numbers[position])
+        return None if following is None else chapters.ids[following]
+
+    # ============ Scheduling ============
+    def on_chapter_opened(self, source: "BaseMangaSource", chapter_id: str) -> None:
+        if prefetching.get():
+            return
+        next_id = self.next_chapter(source.source_id, chapter_id)
+        key = (source.source_id, next_id)
+        if next_id is None or key in self._tasks:
+            return
+        if len(self._tasks) >= self.max_inflight:
+            self.counters["skipped"] += 1
+            return
+        self.counters["scheduled"] += 1
+        task = asyncio.create_task(self._prefetch(source, next_id))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    def _has_budget(self, source: "BaseMangaSource", url: str) -> bool:
+        return (
+            source.free_fetch_slots() >= self.min_free_slots
+            and source.host_limiter(url).bucket.available() >= 1
+        )
+
+    def _has_image_budget(self, source: "BaseMangaSource", url: str, store: "ImageStore") -> bool:
+        return (
+            store.downloads_in_flight(source.source_id) < self.max_image_downloads
+            and source.host_limiter(url, images=True).bucket.available() >= 1
+        )
+
+    async def _prefetch(self, source: "BaseMangaSource", chapter_id: str) -> None:
+        prefetching.set(True)
+        try:
+            await asyncio.sleep(self.delay)
+            if not self._has_budget(source, source.base_url):
+                self.counters["skipped"] += 1
+                return
+            pages = await source.get_chapter_pages(chapter_id)
+            self.counters["pages"] += 1
+
+            from downloader.store import get_image_store
+            store = get_image_store()
+            for url in pages.pages[:self.images]:
+                if store.contains(url):
+                    continue
+                if not self._has_image_budget(source, url, store):
+                    self.counters["skipped"] += 1
+                    return
+                await store.fetch(source, url)
+                self.counters["images"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Prefetch error ({source.source_id}/{chapter_id}): {e}")
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "inflight": len(self._tasks),
+            "series": len(self._series),
+        }
+
+_prefetcher: Optional[ChapterPrefetcher] = None
+
+def get_prefetcher() -> Optional[ChapterPrefetcher]:
+    """Get the shared prefetcher, or None when prefetching is disabled"""
+    global _prefetcher
+    if not settings.PREFETCH_ENABLED:
+        return None
+    if _prefetcher is None:
+        _prefetcher = ChapterPrefetcher()
+    return _prefetcher
@@ -0,0 +1,147 @@
+"""Opt-in profiling of individual scrape calls.
+
+With PROFILING_ENABLED set, a scrape call is profiled when the caller
+asks for it (the ``profile_request`` context variable, set by the API
+from the PROFILE_HEADER request header when PROFILE_TOKEN is presented)
+or when it is picked by PROFILE_SAMPLE_RATE. Requested profiles bypass
+the response cache so they measure real work.
+
+Each profile writes ``<stamp>-<source>-<method>-<hash>`` files to
+PROFILE_DIR: ``.json`` metadata, ``.prof`` (cProfile, open with pstats
+or snakeviz) and ``.mem.txt`` (top tracemalloc allocation sites). Only
+the newest PROFILE_MAX_DUMPS profiles are kept.
+
+cProfile traces the event loop thread only, so it also sees other tasks
+that ran during the call, and not the scraper thread pool; only one
+profile runs at a time, and overlapping calls run unprofiled.
+"""
+import asyncio
+import cProfile
+import hashlib
+import json
+import os
+import random
+import time
+import tracemalloc
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
+from tracemalloc import Snapshot
+from config import settings
+
+MODES = ("cpu", "memory")
+
+# Comma-separated modes ("cpu", "memory", or "1" for PROFILE_MODES)
+profile_request: ContextVar[Optional[str]] = ContextVar("profile_request", default=None)
+
+_active = False
+
+def _parse_modes(flag: str) -> Set[str]:
+    modes = {mode.strip().lower() for mode in flag.split(",")} & set(MODES)
+    return modes or set(settings.PROFILE_MODES)
+
+def forced() -> bool:
+    """Whether the current request asked for a profile and will get one;
+    when another profile is running, the call is served normally"""
+    return settings.PROFILING_ENABLED and bool(profile_request.get()) and not _active
+
+def _choose_modes() -> Optional[Set[str]]:
+    if not settings.PROFILING_ENABLED or _active:
+        return None
+    flag = profile_request.get()
+    if flag:
+        return _parse_modes(flag)
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return set(settings.PROFILE_MODES)
+    return None
+
+async def profiled(source_id: str, method: str, args: Tuple[Any, ...],
+                   call: Callable[[], Awaitable[Any]]) -> Any:
+    """Await call(), profiling it if requested or sampled"""
+    global _active
+    modes = _choose_modes()
+    if not modes:
+        return await call()
+
+    _active = True
+    profiler = cProfile.Profile() if "cpu" in modes else None
+    started_tracing = "memory" in modes and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(settings.PROFILE_TRACEBACK_DEPTH)
+    if "memory" in modes:
+        tracemalloc.reset_peak()
+        # Snapshots copy every trace; keep that off the event loop
+        try:
+            before = await asyncio.to_thread(tracemalloc.take_snapshot)
+        except asyncio.CancelledError:
+            if started_tracing:
+                tracemalloc.stop()
+            _active = False
+            raise
+    error = None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return await call()
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        memory = None
+        if "memory" in modes:
+            peak = tracemalloc.get_traced_memory()[1]
+            after = await asyncio.to_thread(tracemalloc.take_snapshot)
+            memory = (peak, before, after)
+            if started_tracing:
+                tracemalloc.stop()
+        _active = False
+        meta = {
+            "source": source_id,
+            "method": method,
+            "args": [repr(arg) for arg in args],
+            "modes": sorted(modes),
+            "elapsed_s": elapsed,
+            "error": repr(error) if error else None,
+        }
+        try:
+            await asyncio.to_thread(_dump, meta, profiler, memory)
+        except Exception as e:
+            print(f"Profile dump error: {e}")
+
+def _dump(meta: dict, profiler: Optional[cProfile.Profile],
+          memory: Optional[Tuple[int, Snapshot, Snapshot]]) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    digest = hashlib.sha256(repr(meta["args"]).encode()).hexdigest()[:8]
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(
+        settings.PROFILE_DIR, f"{stamp}-{meta['source']}-{meta['method']}-{digest}"
+    )
+    if profiler is not None:
+        profiler.dump_stats(base + ".prof")
+    if memory is not None:
+        peak, before, after = memory
+        stats = after.compare_to(before, "lineno")
+        meta["peak_traced_bytes"] = peak
+        with open(base + ".mem.txt", "w") as f:
+            f.write(f"peak traced memory: {peak / 1024:.1f} KiB\n")
+            for stat in stats[:settings.PROFILE_TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+    with open(base + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+    _prune()
+
+def _prune() -> None:
+    """Delete the oldest profiles beyond PROFILE_MAX_DUMPS"""
+    # Every profile has a .json file, and names start with a timestamp
+    bases = sorted(
+        name[:-len(".json")] for name in os.listdir(settings.PROFILE_DIR)
+        if name.endswith(".json")
+    )
+    for base in bases[:max(0, len(bases) - settings.PROFILE_MAX_DUMPS)]:
+        for ext in (".json", ".prof", ".mem.txt"):
+            path = os.path.join(settings.PROFILE_DIR, base + ext)
+            if os.path.exists(path):
+                os.unlink(path)
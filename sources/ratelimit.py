@@ -0,0 +1,223 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from config import settings
+
+# Upstream statuses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+class RateLimitExceeded(Exception):
+    """An API client went over its request budget"""
+
+    def __init__(self, client_id: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {client_id}, retry in {retry_after:.1f}s")
+        self.client_id = client_id
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    ``reserve()`` always takes a token and returns how long the caller must
+    wait before using it, so waiters queue up in arrival order. Used from
+    both the event loop and the scraper threads.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # Tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the wait time"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+class HostLimiter:
+    """Request budget for one upstream host with AIMD rate adaptation.
+
+    The rate starts at the configured ceiling, is halved on every 429/503
+    and creeps back up by a twentieth of the ceiling per successful
+    response. A Retry-After blocks the whole host until it expires.
+    """
+
+    def __init__(self, host: str, rate: float, burst: int):
+        self.host = host
+        self.max_rate = rate
+        self.min_rate = min(rate, 0.1)
+        self.bucket = TokenBucket(rate, burst)
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a request slot; returns the seconds to wait before sending"""
+        with self._lock:
+            self.requests += 1
+            blocked = self.blocked_until - time.monotonic()
+        return max(blocked, self.bucket.reserve())
+
+    def record(self, status: int, retry_after: Optional[str], attempt: int) -> Optional[float]:
+        """Feed back a response status.
+
+        Returns the delay before retrying a throttled request, or None when
+        the response should be returned as is.
+        """
+        if status not in THROTTLE_STATUSES:
+            with self._lock:
+                rate = self.bucket.rate
+                if rate < self.max_rate:
+                    self.bucket.set_rate(min(self.max_rate, rate + self.max_rate / 20))
+            return None
+
+        wait = parse_retry_after(retry_after)
+        with self._lock:
+            self.throttled += 1
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+            if wait is not None:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + wait)
+
+        if attempt + 1 >= settings.RETRY_MAX_ATTEMPTS:
+            return None
+        backoff = min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        if wait is not None:
+            if wait > settings.RETRY_BACKOFF_MAX:
+                return None
+            delay = wait + random.uniform(0, backoff / 2)
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            blocked = max(0.0, self.blocked_until - time.monotonic())
+        return {
+            "rate": round(self.bucket.rate, 3),
+            "max_rate": self.max_rate,
+            "tokens": round(self.bucket.available(), 2),
+            "blocked_for": round(blocked, 2),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+class RateLimiter:
+    """Registry of per-host and per-API-client buckets.
+
+    Page scrapes and image downloads from the same host use separate
+    budgets (HOST_RATE_* and IMAGE_HOST_RATE_*).
+    """
+
+    def __init__(self):
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._image_hosts: Dict[str, HostLimiter] = {}
+        self._clients: Dict[str, TokenBucket] = {}
+        self._clients_swept = time.monotonic()
+        self._lock = threading.Lock()
+
+    def host(self, host: str, images: bool = False) -> HostLimiter:
+        limiters = self._image_hosts if images else self._hosts
+        limiter = limiters.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = limiters.get(host)
+                if limiter is None:
+                    if images:
+                        limiter = HostLimiter(
+                            host, settings.IMAGE_HOST_RATE_LIMIT, settings.IMAGE_HOST_RATE_BURST
+                        )
+                    else:
+                        rate = settings.HOST_RATE_LIMITS.get(host, settings.HOST_RATE_LIMIT)
+                        limiter = HostLimiter(host, rate, settings.HOST_RATE_BURST)
+                    limiters[host] = limiter
+        return limiter
+
+    def check_client(self, client_id: str) -> None:
+        """Count one API request, raising RateLimitExceeded over budget"""
+        bucket = self._clients.get(client_id)
+        if bucket is None:
+            bucket = self._clients.setdefault(client_id, TokenBucket(
+                settings.RATE_LIMIT / settings.RATE_LIMIT_PERIOD, settings.RATE_LIMIT
+            ))
+        wait = bucket.try_acquire()
+        if time.monotonic() - self._clients_swept >= settings.RATE_LIMIT_PERIOD:
+            self._evict_idle_clients()
+        if wait:
+            raise RateLimitExceeded(client_id, wait)
+
+    def _evict_idle_clients(self) -> None:
+        # A bucket idle for a whole period is full again, the same as a new one
+        with self._lock:
+            now = time.monotonic()
+            self._clients_swept = now
+            idle = [
+                client_id for client_id, bucket in self._clients.items()
+                if now - bucket.updated >= settings.RATE_LIMIT_PERIOD
+            ]
+            for client_id in idle:
+                del self._clients[client_id]
+
+    def snapshot(self) -> dict:
+        return {
+            "hosts": {host: limiter.snapshot() for host, limiter in self._hosts.items()},
+            "image_hosts": {
+                host: limiter.snapshot() for host, limiter in self._image_hosts.items()
+            },
+            "clients": {
+                client_id: round(bucket.available(), 2)
+                for client_id, bucket in self._clients.items()
+            },
+        }
+
+_rate_limiter: Optional[RateLimiter] = None
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the shared rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
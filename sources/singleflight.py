@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one in-flight future.
+
+    The first caller for a key runs the work; callers arriving while it is
+    still running await the same future instead of starting their own.
+    Cancelling one waiter does not cancel the shared work.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.merged = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.merged += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+
+        def forget(done: asyncio.Future) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Mark the exception retrieved even if every waiter was cancelled
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(forget)
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executed": self.calls - self.merged,
+            "merged": self.merged,
+            "inflight": len(self._inflight),
+        }
+
+# Shared by all sources; keys include the source ID
+single_flight = SingleFlight()
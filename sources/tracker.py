@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from config import settings
+from models.chapters import ChapterList
+from models.schemas import MangaDetails
+from .base import BaseMangaSource, ConditionalResponse
+
+@dataclass
+class SeriesIndex:
+    """Stored chapter list of one series plus its HTTP validators"""
+    source: str
+    manga_id: str
+    details: MangaDetails
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    first_seen: Dict[str, float] = field(default_factory=dict)  # chapter ID -> timestamp
+    checked_at: float = 0.0
+
+@dataclass
+class ChapterDiff:
+    not_modified: bool
+    added: ChapterList = field(default_factory=ChapterList)
+    removed: List[str] = field(default_factory=list)  # chapter IDs
+
+class ChapterTracker:
+    """Per-series chapter index refreshed with conditional requests.
+
+    A refresh sends the stored ETag / Last-Modified; a 304 costs nothing
+    beyond the request. On a changed page only chapters whose IDs were
+    not seen before are built from their records, the rest are reused
+    from the stored index. With ``path`` set, indexes are persisted
+    as one JSON file per series.
+
+    At most ``max_series`` indexes are kept in memory, least recently
+    used first out; with ``path`` set an evicted index is read back from
+    its file on next use, without it the series starts over.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_series: Optional[int] = None):
+        self.path = path
+        self.max_series = max_series or settings.CHAPTER_INDEX_MAX_SERIES
+        self._series: "OrderedDict[Tuple[str, str], SeriesIndex]" = OrderedDict()
+        # Per-series refresh locks with their number of users, kept only while in use
+        self._locks: Dict[Tuple[str, str], Tuple[asyncio.Lock, int]] = {}
+
+    def get(self, source_id: str, manga_id: str) -> Optional[SeriesIndex]:
+        key = (source_id, manga_id)
+        index = self._series.get(key)
+        if index is not None:
+            self._series.move_to_end(key)
+        elif self.path:
+            index = self._load(key)
+            if index is not None:
+                self._remember(index)
+        return index
+
+    def _remember(self, index: SeriesIndex) -> None:
+        key = (index.source, index.manga_id)
+        self._series[key] = index
+        self._series.move_to_end(key)
+        while len(self._series) > self.max_series:
+            self._series.popitem(last=False)
+
+    async def refresh(self, source: BaseMangaSource, manga_id: str) -> ChapterDiff:
+        """Bring the stored chapter list up to date and return what changed"""
+        key = (source.source_id, manga_id)
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                return await self._refresh(source, manga_id)
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def _refresh(self, source: BaseMangaSource, manga_id: str) -> ChapterDiff:
+        index = self.get(source.source_id, manga_id)
+        url = source.details_url(manga_id)
+        response = await source.fetch_conditional(
+            url,
+            etag=index.etag if index else None,
+            last_modified=index.last_modified if index else None,
+        )
+        now = time.time()
+        if response.not_modified:
+            if index is not None:
+                index.checked_at = now
+                return ChapterDiff(not_modified=True)
+            # A 304 to a request without validators (e.g. from a cache on
+            # the way); with nothing stored to reuse, fetch the page again
+            response = ConditionalResponse(False, await source.fetch_page(url), None, None)
+
+        record = await source.extract(source.details_extractor, response.text)
+        known = index.details.chapters if index else ChapterList()
+        positions = known.positions()
+        first_seen = dict(index.first_seen) if index else {}
+
+        rows, added, seen = [], [], set()
+        for ch_record in record["chapters"]:
+            ch_id = source.chapter_record_id(ch_record)
+            seen.add(ch_id)
+            position = positions.get(ch_id)
+            if position is None:
+                row = source.chapter_row(ch_record)
+                added.append(row)
+                first_seen[ch_id] = now
+            else:
+                row = known.row(position)
+            rows.append(row)
+        removed = [ch_id for ch_id in known.ids if ch_id not in seen]
+        for ch_id in removed:
+            first_seen.pop(ch_id, None)
+
+        chapters = ChapterList(rows)
+        details = source.build_details(manga_id, url, record, chapters)
+        index = SeriesIndex(
+            source=source.source_id,
+            manga_id=manga_id,
+            details=details,
+            etag=response.etag,
+            last_modified=response.last_modified,
+            first_seen=first_seen,
+            checked_at=now,
+        )
+        self._remember(index)
+        await source.cache_result("get_manga_details", details, manga_id)
+        if self.path:
+            await asyncio.to_thread(self._save, index)
+        return ChapterDiff(not_modified=False, added=ChapterList(added), removed=removed)
+
+    def chapters_since(self, source_id: str, manga_id: str,
+                       number: Optional[float] = None,
+                       since: Optional[float] = None) -> ChapterList:
+        """Chapters numbered above ``number`` and/or first seen after the
+        ``since`` timestamp, in ascending chapter order"""
+        index = self.get(source_id, manga_id)
+        if index is None:
+            return ChapterList()
+        rows = [
+            row for row in index.details.chapters.rows()
+            if (number is None or row.number > number)
+            and (since is None or index.first_seen.get(row.id, 0) > since)
+        ]
+        return ChapterList(sorted(rows, key=lambda row: row.number))
+
+    # ============ Persistence ============
+    def _file(self, key: Tuple[str, str]) -> str:
+        source_id, manga_id = key
+        safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in manga_id)
+        return os.path.join(self.path, source_id, f"{safe_id}.json")
+
+    def _load(self, key: Tuple[str, str]) -> Optional[SeriesIndex]:
+        # A missing, corrupt or partial file is a miss
+        try:
+            with open(self._file(key)) as f:
+                data = json.load(f)
+            data["details"] = MangaDetails.model_validate(data["details"])
+            return SeriesIndex(**data)
+        except (OSError, ValueError, KeyError, TypeError, ValidationError):
+            return None
+
+    def _save(self, index: SeriesIndex) -> None:
+        path = self._file((index.source, index.manga_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {
+            "source": index.source,
+            "manga_id": index.manga_id,
+            "details": index.details.model_dump(mode="json"),
+            "etag": index.etag,
+            "last_modified": index.last_modified,
+            "first_seen": index.first_seen,
+            "checked_at": index.checked_at,
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+_chapter_tracker: Optional[ChapterTracker] = None
+
+def get_chapter_tracker() -> ChapterTracker:
+    """Get the shared chapter tracker"""
+    global _chapter_tracker
+    if _chapter_tracker is None:
+        _chapter_tracker = ChapterTracker(settings.CHAPTER_INDEX_PATH)
+    return _chapter_tracker
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set
+from config import settings
+from models.schemas import MangaUpdateEvent
+from .base import BaseMangaSource
+from .tracker import ChapterTracker, get_chapter_tracker
+
+class SourceWatch:
+    """Polling state for one source"""
+
+    # Weight of the newest observation in the publish-rate average
+    ALPHA = 0.3
+
+    def __init__(self, source: BaseMangaSource, interval: float, max_series: int):
+        self.source = source
+        self.interval = interval
+        self.max_series = max_series
+        self.rate = 0.0  # Smoothed changed series per second
+        # manga ID -> latest chapter, least recently listed first
+        self.seen: Optional["OrderedDict[str, Optional[str]]"] = None
+        self.last_poll: Optional[float] = None
+        self.last_changes = 0
+        self.errors = 0
+
+    def remember(self, current: Dict[str, Optional[str]]) -> None:
+        """Record this round's markers, forgetting the series listed longest ago.
+
+        A forgotten series has dropped far off the latest pages, so when it
+        reappears there it has a new chapter anyway."""
+        if self.seen is None:
+            self.seen = OrderedDict()
+        for manga_id, marker in current.items():
+            self.seen[manga_id] = marker
+            self.seen.move_to_end(manga_id)
+        while len(self.seen) > self.max_series:
+            self.seen.popitem(last=False)
+
+    def adapt(self, changes: int, now: float, min_interval: float, max_interval: float) -> None:
+        """Poll about as often as the source publishes: aim for roughly one
+        changed series per poll, backing off while nothing happens."""
+        if self.last_poll is not None:
+            sample = changes / max(now - self.last_poll, 1e-6)
+            self.rate = self.ALPHA * sample + (1 - self.ALPHA) * self.rate
+        self.last_poll = now
+        self.last_changes = changes
+        if changes:
+            target = 1 / self.rate if self.rate > 0 else self.interval / 2
+        else:
+            target = self.interval * 1.5
+        self.interval = min(max_interval, max(min_interval, target))
+
+class UpdateWatcher:
+    """Background scheduler that finds new chapters via get_latest.
+
+    Each source is polled on its own adaptive interval. Series whose
+    latest-chapter marker changed get their cached details invalidated
+    and a targeted ChapterTracker refresh, and an event is published to
+    every subscriber.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, BaseMangaSource]] = None,
+                 tracker: Optional[ChapterTracker] = None,
+                 pages: Optional[int] = None,
+                 min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None,
+                 max_series: Optional[int] = None):
+        self._sources = sources
+        self.tracker = tracker or get_chapter_tracker()
+        self.pages = pages or settings.WATCHER_PAGES
+        self.min_interval = min_interval or settings.WATCHER_MIN_INTERVAL
+        self.max_interval = max_interval or settings.WATCHER_MAX_INTERVAL
+        self.max_series = max_series or settings.WATCHER_MAX_SERIES
+        self.watches: Dict[str, SourceWatch] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def _get_sources(self) -> Dict[str, BaseMangaSource]:
+        if self._sources is None:
+            from . import get_all_sources
+            return get_all_sources()
+        return self._sources
+
+    # ============ Lifecycle ============
+    def start(self) -> None:
+        """Start one polling loop per source"""
+        if self._tasks:
+            return
+        for source_id, source in self._get_sources().items():
+            watch = self.watches.setdefault(
+                source_id, SourceWatch(source, self.min_interval, self.max_series)
+            )
+            self._tasks.append(asyncio.create_task(self._run(watch)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, watch: SourceWatch) -> None:
+        while True:
+            try:
+                await self.poll(watch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                watch.errors += 1
+                print(f"Watcher error ({watch.source.source_id}): {e}")
+            await asyncio.sleep(watch.interval)
+
+    # ============ Polling ============
+    async def poll(self, watch: SourceWatch) -> List[MangaUpdateEvent]:
+        """Run one polling round for a source and publish its events"""
+        source = watch.source
+        current: Dict[str, Optional[str]] = {}
+        titles: Dict[str, str] = {}
+        for page in range(1, self.pages + 1):
+            await source.invalidate("get_latest", page)
+            for item in await source.get_latest(page):
+                current.setdefault(item.id, item.latest_chapter)
+                titles.setdefault(item.id, item.title)
+
+        # The first round only records a baseline
+        changed = [] if watch.seen is None else [
+            manga_id for manga_id, marker in current.items()
+            if watch.seen.get(manga_id, object()) != marker
+        ]
+        watch.remember(current)
+        watch.adapt(len(changed), time.monotonic(), self.min_interval, self.max_interval)
+
+        events = await asyncio.gather(*(
+            self._refresh(source, manga_id, titles[manga_id], current[manga_id])
+            for manga_id in changed
+        ))
+        for event in events:
+            self._publish(event)
+        return list(events)
+
+    async def _refresh(self, source: BaseMangaSource, manga_id: str,
+                       title: str, latest_chapter: Optional[str]) -> MangaUpdateEvent:
+        await source.invalidate("get_manga_details", manga_id)
+        had_index = self.tracker.get(source.source_id, manga_id) is not None
+        new_chapters = []
+        try:
+            diff = await self.tracker.refresh(source, manga_id)
+            if had_index:
+                new_chapters = diff.added
+        except Exception as e:
+            print(f"Watcher refresh error ({source.source_id}/{manga_id}): {e}")
+        return MangaUpdateEvent(
+            source=source.source_id,
+            manga_id=manga_id,
+            title=title,
+            latest_chapter=latest_chapter,
+            new_chapters=new_chapters,
+            detected_at=datetime.now(timezone.utc),
+        )
+
+    # ============ Subscribers ============
+    def _publish(self, event: MangaUpdateEvent) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # Slow consumers lose the oldest events, not the newest
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def subscribe(self, max_queue: int = 100) -> AsyncIterator[MangaUpdateEvent]:
+        """Stream update events until the consumer stops iterating"""
+        queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            source_id: {
+                "interval": watch.interval,
+                "rate_per_hour": watch.rate * 3600,
+                "last_changes": watch.last_changes,
+                "tracked_series": len(watch.seen or {}),
+                "errors": watch.errors,
+            }
+            for source_id, watch in self.watches.items()
+        }
+
+_update_watcher: Optional[UpdateWatcher] = None
+
+def get_update_watcher() -> UpdateWatcher:
+    """Get the shared update watcher"""
+    global _update_watcher
+    if _update_watcher is None:
+        _update_watcher = UpdateWatcher()
+    return _update_watcher